@@ -53,7 +53,7 @@ try:
     from agents.inventory_agent import InventoryAgent
     from agents.stock_calculator_agent import StockCalculatorAgent
     from agents.transaction_agent import TransactionAgent
-    from tools.google_sheets_inventory_tool import GoogleSheetsInventoryTool, GoogleSheetsInventoryInput
+    from src.tools.google_sheets_inventory_tool import GoogleSheetsInventoryTool, GoogleSheetsInventoryInput
     AGENTS_AVAILABLE = True
 except ImportError as e:
     AGENTS_AVAILABLE = False
@@ -0,0 +1,54 @@
+"""
+Column-oriented view of the product records returned by the inventory tool.
+
+The catalogue-wide reports work on whole columns at once, so the records are split
+into NumPy arrays a single time per inventory snapshot and shared between reports.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+class ProductTable:
+    """Product records as quantity, price, stock value, id, name and category columns."""
+
+    __slots__ = ("products", "ids", "names", "qty", "price", "value", "_category_labels", "_category_groups")
+
+    def __init__(self, products: List[Dict[str, Any]], ids: np.ndarray, names: np.ndarray,
+                 qty: np.ndarray, price: np.ndarray, category_labels: np.ndarray):
+        # The records themselves stay available for the per-line report fields
+        self.products = products
+        self.ids = ids
+        self.names = names
+        self.qty = qty
+        self.price = price
+        self.value = qty * price
+        self._category_labels = category_labels
+        self._category_groups = None
+
+    @classmethod
+    def from_tool_result(cls, products: List[Dict[str, Any]]) -> "ProductTable":
+        """Build the columns from a list of product records."""
+        count = len(products)
+        return cls(
+            products,
+            np.array([p["product_id"] for p in products], dtype=str),
+            np.array([p["product_name"] for p in products], dtype=str),
+            np.fromiter((p["quantity"] for p in products), dtype=np.int64, count=count),
+            np.fromiter((p["price"] for p in products), dtype=np.float64, count=count),
+            np.array([p["category"] for p in products], dtype=object)
+        )
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def group_by_category(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Category code per product and the distinct categories in first-seen order."""
+        if self._category_groups is None:
+            # pandas is only needed once a report groups by category, so it is not paid for at import
+            import pandas as pd
+            
+            # Factorized on first use and kept for the lifetime of the table
+            self._category_groups = pd.factorize(self._category_labels)
+        return self._category_groups
@@ -5,6 +5,7 @@ Inventory Analysis Agent - Specialized agent for inventory management and analys
 from typing import Dict, Any, List
 from src.agents.base_agent import BaseAgent
 from src.tools.google_sheets_inventory_tool import GoogleSheetsInventoryTool, GoogleSheetsInventoryInput
+import heapq
 
 
 class InventoryAgent(BaseAgent):
@@ -263,8 +264,8 @@ class InventoryAgent(BaseAgent):
                 categories[cat]["quantity"] += product["quantity"]
                 categories[cat]["value"] += product["quantity"] * product["price"]
             
-            # Top products by value
-            products_by_value = sorted(products, key=lambda x: x["quantity"] * x["price"], reverse=True)
+            # Top products by value; only five are shown, so keep a small heap instead of sorting everything
+            top_by_value = heapq.nlargest(5, products, key=lambda x: x["quantity"] * x["price"])
             
             summary = f"""📋 **INVENTORY SUMMARY**
 ═══════════════════════════════
@@ -282,7 +283,7 @@ class InventoryAgent(BaseAgent):
                 summary += f"\n• {category}: {data['count']} products, ${data['value']:,.2f} ({percentage:.1f}%)"
             
             summary += f"\n\n💰 **Top 5 Products by Value:**"
-            for i, product in enumerate(products_by_value[:5], 1):
+            for i, product in enumerate(top_by_value, 1):
                 value = product["quantity"] * product["price"]
                 summary += f"\n{i}. {product['product_name']}: ${value:,.2f} ({product['quantity']} × ${product['price']:.2f})"
             
@@ -2,12 +2,121 @@
 Sales Agent - Specialized agent for sales operations with automatic stock management.
 """
 
-from typing import Dict, Any, List, Optional
+import heapq
+import re
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 from src.agents.base_agent import BaseAgent
+from src.tools.base_tool import ToolOutput
 from src.tools.transaction_tool import TransactionTool, TransactionInput
 from src.tools.google_sheets_inventory_tool import GoogleSheetsInventoryTool, GoogleSheetsInventoryInput
 
 
+# Product IDs such as LAPTOP001, matched case-insensitively
+_PRODUCT_ID_RE = re.compile(r'\b([A-Za-z]+\d+)\b')
+
+# Stock buckets returned by SalesAgent._stock_bucket()
+_OUT_OF_STOCK, _CRITICAL_STOCK, _LOW_STOCK, _IN_STOCK = range(4)
+
+# (emoji, status text, availability template, recommendation) per stock bucket
+_AVAILABILITY_META = (
+    ("🚨", "OUT OF STOCK", "Not Available", "Immediate reorder required"),
+    ("🔴", "CRITICAL STOCK", "Limited ({quantity} units)", "Urgent reorder needed"),
+    ("🟡", "LOW STOCK", "Available ({quantity} units)", "Consider reordering soon"),
+    ("✅", "IN STOCK", "Available ({quantity} units)", "Stock levels are healthy"),
+)
+
+# Post-sale alert appended to the sale confirmation, per stock bucket
+_POST_SALE_ALERTS = (
+    "\n\n🚨 **CRITICAL ALERT**: {product_name} is now OUT OF STOCK!"
+    "\n• Immediate reorder required"
+    "\n• Consider removing from sales displays",
+    "\n\n🔴 **CRITICAL STOCK**: Only {stock} units left!"
+    "\n• Urgent reorder needed",
+    "\n\n🟡 **LOW STOCK WARNING**: {stock} units remaining"
+    "\n• Plan reorder within 1-2 weeks",
+    "",
+)
+
+# Static replies; only the general prompt is followed by the user's message
+_RETURN_REFUND_RESPONSE = """🔄 **RETURNS & REFUNDS**
+
+Return and refund processing is not yet implemented.
+
+**For now, please:**
+1. Process manual stock adjustment to add returned items back
+2. Record refund amount separately
+3. Update customer records manually
+
+**Future features will include:**
+• Automated return processing
+• Refund calculations
+• Customer credit management
+• Return reason tracking
+
+**Need help with a manual adjustment?**
+Ask me to "adjust [PRODUCT_ID] by +[quantity] (returned item)"
+"""
+
+_CUSTOMER_HISTORY_RESPONSE = """👤 **CUSTOMER HISTORY**
+
+Customer purchase history tracking is not yet fully implemented.
+
+**Current capabilities:**
+• Transaction records include customer information
+• Sales reports show recent customer purchases
+
+**Future features will include:**
+• Customer purchase history lookup
+• Customer loyalty tracking
+• Purchase pattern analysis
+• Personalized recommendations
+
+**For now, check recent sales in the sales report for customer information.**
+"""
+
+_GENERAL_SALES_PROMPT = """💰 **Sales Agent Ready!**
+
+I specialize in sales operations with automatic inventory management:
+
+🛒 **Sales Processing:**
+• "Quick sale: 2 LAPTOP001 for $1299.99"
+• "Sell 1 PHONE001 to John Doe"
+• Automatic stock deduction and alerts
+
+📦 **Stock Availability:**
+• "Check stock for LAPTOP001"
+• "Is PHONE001 available?"
+• Real-time availability checking
+
+📊 **Sales Analytics:**
+• "Generate sales report"
+• "Show sales performance"
+• Revenue and product analysis
+
+🚨 **Stock Alerts:**
+• "Show low stock alerts"
+• "Stock alerts for sales team"
+• Critical stock notifications
+
+🎯 **What sales operation can I help you with?**
+
+"""
+
+
+class _ProductPerformance:
+    """Per-product sales totals accumulated by the sales report."""
+    
+    __slots__ = ("name", "units_sold", "revenue", "transactions")
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.units_sold = 0
+        self.revenue = 0
+        self.transactions = 0
+
+
 class SalesAgent(BaseAgent):
     """
     Specialized agent for sales operations.
@@ -44,7 +153,9 @@ class SalesAgent(BaseAgent):
             # Determine what sales operation to perform
             operation = self._classify_sales_request(message)
             
-            if operation == "quick_sale":
+            if operation == "sales_dashboard":
+                response = self._generate_sales_dashboard()
+            elif operation == "quick_sale":
                 response = self._handle_quick_sale(message)
             elif operation == "check_availability":
                 response = self._check_stock_availability(message)
@@ -69,7 +180,12 @@ class SalesAgent(BaseAgent):
         """Classify the type of sales request."""
         message_lower = message.lower()
         
-        if any(word in message_lower for word in ['sell', 'sale', 'quick sale', 'process sale']):
+        wants_report = any(word in message_lower for word in ['sales report', 'sales performance', 'revenue'])
+        wants_alerts = any(word in message_lower for word in ['low stock', 'stock alert', 'running low'])
+        
+        if wants_report and wants_alerts:
+            return "sales_dashboard"
+        elif any(word in message_lower for word in ['sell', 'sale', 'quick sale', 'process sale']):
             return "quick_sale"
         elif any(word in message_lower for word in ['check stock', 'availability', 'in stock', 'available']):
             return "check_availability"
@@ -88,11 +204,10 @@ class SalesAgent(BaseAgent):
         """Handle quick sale requests with stock validation."""
         try:
             # Extract sale details from message
-            import re
             
             # Extract product ID
-            product_match = re.search(r'\b([A-Z]+\d+)\b', message.upper())
-            product_id = product_match.group(1) if product_match else None
+            product_match = _PRODUCT_ID_RE.search(message)
+            product_id = product_match.group(1).upper() if product_match else None
             
             # Extract quantity
             quantity_match = re.search(r'\b(\d+)\s*(?:units?|pieces?|items?)?\b', message)
@@ -179,16 +294,9 @@ Please provide the product ID for the sale.
 **🆔 Transaction ID:** {sale_data['transaction_id']}"""
 
                 # Add stock alerts
-                if new_stock == 0:
-                    response += f"\n\n🚨 **CRITICAL ALERT**: {product['product_name']} is now OUT OF STOCK!"
-                    response += "\n• Immediate reorder required"
-                    response += "\n• Consider removing from sales displays"
-                elif new_stock <= self.critical_stock_threshold:
-                    response += f"\n\n🔴 **CRITICAL STOCK**: Only {new_stock} units left!"
-                    response += "\n• Urgent reorder needed"
-                elif new_stock <= self.low_stock_threshold:
-                    response += f"\n\n🟡 **LOW STOCK WARNING**: {new_stock} units remaining"
-                    response += "\n• Plan reorder within 1-2 weeks"
+                alert = _POST_SALE_ALERTS[self._stock_bucket(new_stock)]
+                if alert:
+                    response += alert.format(product_name=product['product_name'], stock=new_stock)
                 
                 return response
             else:
@@ -200,11 +308,9 @@ Please provide the product ID for the sale.
     def _check_stock_availability(self, message: str) -> str:
         """Check stock availability for products."""
         try:
-            import re
-            
             # Extract product ID
-            product_match = re.search(r'\b([A-Z]+\d+)\b', message.upper())
-            product_id = product_match.group(1) if product_match else None
+            product_match = _PRODUCT_ID_RE.search(message)
+            product_id = product_match.group(1).upper() if product_match else None
             
             if not product_id:
                 return """📦 **STOCK AVAILABILITY CHECK**
@@ -239,26 +345,8 @@ Please specify a product ID to check availability.
             quantity = product["quantity"]
             
             # Determine availability status
-            if quantity == 0:
-                status_emoji = "🚨"
-                status_text = "OUT OF STOCK"
-                availability = "Not Available"
-                recommendation = "Immediate reorder required"
-            elif quantity <= self.critical_stock_threshold:
-                status_emoji = "🔴"
-                status_text = "CRITICAL STOCK"
-                availability = f"Limited ({quantity} units)"
-                recommendation = "Urgent reorder needed"
-            elif quantity <= self.low_stock_threshold:
-                status_emoji = "🟡"
-                status_text = "LOW STOCK"
-                availability = f"Available ({quantity} units)"
-                recommendation = "Consider reordering soon"
-            else:
-                status_emoji = "✅"
-                status_text = "IN STOCK"
-                availability = f"Available ({quantity} units)"
-                recommendation = "Stock levels are healthy"
+            status_emoji, status_text, availability, recommendation = _AVAILABILITY_META[self._stock_bucket(quantity)]
+            availability = availability.format(quantity=quantity)
             
             return f"""{status_emoji} **STOCK AVAILABILITY: {product['product_name']}**
 
@@ -282,48 +370,72 @@ Please specify a product ID to check availability.
         except Exception as e:
             return f"❌ Error checking stock availability: {str(e)}"
     
-    def _generate_sales_report(self) -> str:
-        """Generate comprehensive sales report."""
+    def _generate_sales_dashboard(self) -> str:
+        """Generate the sales report and stock alerts together.
+        
+        Both reports need a separate backend read, so the two tool calls are
+        issued concurrently and the reports are built once both have returned.
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            transactions_future = executor.submit(
+                self.transaction_tool.execute, TransactionInput(action="list_transactions")
+            )
+            inventory_future = executor.submit(
+                self.inventory_tool.execute, GoogleSheetsInventoryInput(action="list_all")
+            )
+            transactions_result = transactions_future.result()
+            inventory_result = inventory_future.result()
+        
+        sales_report = self._generate_sales_report(transactions_result)
+        stock_alerts = self._generate_low_stock_alerts(inventory_result)
+        return f"{sales_report}\n\n{stock_alerts}"
+    
+    def _generate_sales_report(self, result: Optional[ToolOutput] = None) -> str:
+        """Generate comprehensive sales report.
+        
+        Args:
+            result: Pre-fetched ``list_transactions`` tool output; fetched when omitted
+        """
         try:
             # Get transaction data
-            result = self.transaction_tool.execute(TransactionInput(action="list_transactions"))
+            if result is None:
+                result = self.transaction_tool.execute(TransactionInput(action="list_transactions"))
             
             if not result.success:
                 return f"❌ Error retrieving sales data: {result.error}"
             
             transactions = result.result
-            sales = [t for t in transactions if t["transaction_type"] == "sale"]
+            # Sales are stored with negative quantities; normalize to positive units once
+            sales = [dict(t, units=abs(t["quantity"])) for t in transactions if t["transaction_type"] == "sale"]
             
             if not sales:
                 return "📊 **No sales transactions found.**"
             
-            # Calculate metrics
-            total_revenue = sum(t["total_amount"] for t in sales)
-            total_units = sum(abs(t["quantity"]) for t in sales)
-            avg_sale_value = total_revenue / len(sales) if sales else 0
-            
-            # Product performance
+            # Calculate metrics and product performance in a single pass
+            total_revenue = 0
+            total_units = 0
             product_performance = {}
             for sale in sales:
+                units = sale["units"]
+                amount = sale["total_amount"]
+                total_revenue += amount
+                total_units += units
+                
                 pid = sale["product_id"]
-                if pid not in product_performance:
-                    product_performance[pid] = {
-                        "name": sale["product_name"],
-                        "units_sold": 0,
-                        "revenue": 0,
-                        "transactions": 0
-                    }
-                product_performance[pid]["units_sold"] += abs(sale["quantity"])
-                product_performance[pid]["revenue"] += sale["total_amount"]
-                product_performance[pid]["transactions"] += 1
-            
-            # Sort by revenue
-            top_products = sorted(product_performance.items(), key=lambda x: x[1]["revenue"], reverse=True)
-            
-            # Recent sales
-            recent_sales = sorted(sales, key=lambda x: f"{x['date']} {x['time']}", reverse=True)[:5]
-            
-            report = f"""📊 **COMPREHENSIVE SALES REPORT**
+                data = product_performance.get(pid)
+                if data is None:
+                    data = product_performance[pid] = _ProductPerformance(sale["product_name"])
+                data.units_sold += units
+                data.revenue += amount
+                data.transactions += 1
+            
+            avg_sale_value = total_revenue / len(sales)
+            
+            # Only the top 5 by revenue and the 5 most recent sales are shown
+            top_products = heapq.nlargest(5, product_performance.items(), key=lambda x: x[1].revenue)
+            recent_sales = heapq.nlargest(5, sales, key=lambda x: (x["date"], x["time"]))
+            
+            parts = [f"""📊 **COMPREHENSIVE SALES REPORT**
 ═══════════════════════════════════════
 
 💰 **Overall Performance:**
@@ -332,150 +444,127 @@ Please specify a product ID to check availability.
 • Total Units Sold: {total_units:,}
 • Average Sale Value: ${avg_sale_value:.2f}
 
-🏆 **Top Performing Products:**"""
+🏆 **Top Performing Products:**"""]
+            append = parts.append
 
-            for i, (pid, data) in enumerate(top_products[:5], 1):
-                avg_price = data["revenue"] / data["units_sold"] if data["units_sold"] > 0 else 0
-                report += f"\n{i}. **{data['name']}** ({pid})"
-                report += f"\n   Revenue: ${data['revenue']:.2f} | Units: {data['units_sold']} | Avg Price: ${avg_price:.2f}"
+            for i, (pid, data) in enumerate(top_products, 1):
+                revenue = data.revenue
+                units_sold = data.units_sold
+                avg_price = revenue / units_sold if units_sold > 0 else 0
+                append(f"\n{i}. **{data.name}** ({pid})")
+                append(f"\n   Revenue: ${revenue:.2f} | Units: {units_sold} | Avg Price: ${avg_price:.2f}")
             
-            report += f"\n\n📅 **Recent Sales:**"
+            append("\n\n📅 **Recent Sales:**")
             for sale in recent_sales:
-                report += f"\n• {sale['date']} - {sale['product_name']}: {abs(sale['quantity'])} units @ ${sale['unit_price']:.2f}"
+                append(f"\n• {sale['date']} - {sale['product_name']}: {sale['units']} units @ ${sale['unit_price']:.2f}")
                 if sale['customer_info']:
-                    report += f" (Customer: {sale['customer_info']})"
+                    append(f" (Customer: {sale['customer_info']})")
             
-            return report
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ Error generating sales report: {str(e)}"
     
-    def _generate_low_stock_alerts(self) -> str:
-        """Generate low stock alerts for sales team."""
+    def _generate_low_stock_alerts(self, result: Optional[ToolOutput] = None) -> str:
+        """Generate low stock alerts for sales team.
+        
+        Args:
+            result: Pre-fetched ``list_all`` inventory tool output; fetched when omitted
+        """
         try:
             # Get all products
-            result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="list_all"))
+            if result is None:
+                result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="list_all"))
             
             if not result.success:
                 return f"❌ Could not retrieve inventory data: {result.error}"
             
             products = result.result
             
-            # Filter products by stock levels
-            out_of_stock = [p for p in products if p["quantity"] == 0]
-            critical_stock = [p for p in products if 0 < p["quantity"] <= self.critical_stock_threshold]
-            low_stock = [p for p in products if self.critical_stock_threshold < p["quantity"] <= self.low_stock_threshold]
+            # Bucket products by stock level in a single pass; healthy items are never materialized
+            out_of_stock, critical_stock, low_stock = buckets = ([], [], [])
+            for bucket, product in self._iter_stock_buckets(products):
+                buckets[bucket].append(product)
             
-            report = "🚨 **SALES TEAM STOCK ALERTS**\n"
-            report += "═══════════════════════════════════════\n\n"
+            parts = ["🚨 **SALES TEAM STOCK ALERTS**\n", "═══════════════════════════════════════\n\n"]
+            append = parts.append
             
             if out_of_stock:
-                report += f"🚨 **OUT OF STOCK - CANNOT SELL ({len(out_of_stock)} items):**\n"
+                append(f"🚨 **OUT OF STOCK - CANNOT SELL ({len(out_of_stock)} items):**\n")
                 for item in out_of_stock:
-                    report += f"• {item['product_name']} ({item['product_id']}) - ${item['price']:.2f}\n"
-                    report += f"  ⚠️ Remove from sales displays immediately\n"
-                report += "\n"
+                    append(f"• {item['product_name']} ({item['product_id']}) - ${item['price']:.2f}\n")
+                    append("  ⚠️ Remove from sales displays immediately\n")
+                append("\n")
             
             if critical_stock:
-                report += f"🔴 **CRITICAL STOCK - LIMIT SALES ({len(critical_stock)} items):**\n"
+                append(f"🔴 **CRITICAL STOCK - LIMIT SALES ({len(critical_stock)} items):**\n")
                 for item in critical_stock:
-                    report += f"• {item['product_name']}: {item['quantity']} left - ${item['price']:.2f}\n"
-                    report += f"  ⚠️ Limit to 1 per customer\n"
-                report += "\n"
+                    append(f"• {item['product_name']}: {item['quantity']} left - ${item['price']:.2f}\n")
+                    append("  ⚠️ Limit to 1 per customer\n")
+                append("\n")
             
             if low_stock:
-                report += f"🟡 **LOW STOCK - MONITOR CLOSELY ({len(low_stock)} items):**\n"
+                append(f"🟡 **LOW STOCK - MONITOR CLOSELY ({len(low_stock)} items):**\n")
                 for item in low_stock:
-                    report += f"• {item['product_name']}: {item['quantity']} units - ${item['price']:.2f}\n"
-                report += "\n"
+                    append(f"• {item['product_name']}: {item['quantity']} units - ${item['price']:.2f}\n")
+                append("\n")
             
             if not (out_of_stock or critical_stock or low_stock):
-                report += "✅ **All products have healthy stock levels!**\n"
-                report += "No immediate stock concerns for sales operations.\n"
+                append("✅ **All products have healthy stock levels!**\n")
+                append("No immediate stock concerns for sales operations.\n")
             else:
-                report += "📋 **SALES TEAM ACTIONS:**\n"
+                append("📋 **SALES TEAM ACTIONS:**\n")
                 if out_of_stock:
-                    report += "• Update displays and remove out-of-stock items\n"
+                    append("• Update displays and remove out-of-stock items\n")
                 if critical_stock:
-                    report += "• Implement purchase limits for critical stock items\n"
+                    append("• Implement purchase limits for critical stock items\n")
                 if low_stock:
-                    report += "• Monitor low stock items closely during sales\n"
-                report += "• Notify management for urgent restocking\n"
+                    append("• Monitor low stock items closely during sales\n")
+                append("• Notify management for urgent restocking\n")
             
-            return report
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ Error generating stock alerts: {str(e)}"
     
+    def _iter_stock_buckets(self, products: Iterable[Dict[str, Any]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (bucket, product) pairs for products that need a stock alert.
+        
+        Buckets are 0 = out of stock, 1 = critical stock, 2 = low stock. Products with a
+        negative quantity are not in any of them and are left out.
+        """
+        thresholds = self._stock_thresholds()
+        for product in products:
+            quantity = product["quantity"]
+            if quantity < 0:
+                continue
+            bucket = bisect_left(thresholds, quantity)
+            if bucket != _IN_STOCK:
+                yield bucket, product
+    
+    def _stock_thresholds(self) -> Tuple[int, int, int]:
+        """Sorted upper bounds of the out-of-stock, critical and low stock buckets."""
+        return (0, self.critical_stock_threshold, self.low_stock_threshold)
+    
+    def _stock_bucket(self, quantity: int) -> int:
+        """Map a stock quantity to its bucket (_OUT_OF_STOCK .. _IN_STOCK).
+        
+        Only zero is out of stock; a negative quantity is treated as critical stock.
+        """
+        if quantity < 0:
+            return _CRITICAL_STOCK
+        return bisect_left(self._stock_thresholds(), quantity)
+    
     def _handle_return_refund(self, message: str) -> str:
         """Handle return and refund requests."""
         # This is a placeholder for return/refund functionality
-        return """🔄 **RETURNS & REFUNDS**
-
-Return and refund processing is not yet implemented.
-
-**For now, please:**
-1. Process manual stock adjustment to add returned items back
-2. Record refund amount separately
-3. Update customer records manually
-
-**Future features will include:**
-• Automated return processing
-• Refund calculations
-• Customer credit management
-• Return reason tracking
-
-**Need help with a manual adjustment?**
-Ask me to "adjust [PRODUCT_ID] by +[quantity] (returned item)"
-"""
+        return _RETURN_REFUND_RESPONSE
     
     def _show_customer_history(self, message: str) -> str:
         """Show customer purchase history."""
         # This is a placeholder for customer history functionality
-        return """👤 **CUSTOMER HISTORY**
-
-Customer purchase history tracking is not yet fully implemented.
-
-**Current capabilities:**
-• Transaction records include customer information
-• Sales reports show recent customer purchases
-
-**Future features will include:**
-• Customer purchase history lookup
-• Customer loyalty tracking
-• Purchase pattern analysis
-• Personalized recommendations
-
-**For now, check recent sales in the sales report for customer information.**
-"""
+        return _CUSTOMER_HISTORY_RESPONSE
     
     def _handle_general_sales_query(self, message: str) -> str:
         """Handle general sales queries."""
-        return f"""💰 **Sales Agent Ready!**
-
-I specialize in sales operations with automatic inventory management:
-
-🛒 **Sales Processing:**
-• "Quick sale: 2 LAPTOP001 for $1299.99"
-• "Sell 1 PHONE001 to John Doe"
-• Automatic stock deduction and alerts
-
-📦 **Stock Availability:**
-• "Check stock for LAPTOP001"
-• "Is PHONE001 available?"
-• Real-time availability checking
-
-📊 **Sales Analytics:**
-• "Generate sales report"
-• "Show sales performance"
-• Revenue and product analysis
-
-🚨 **Stock Alerts:**
-• "Show low stock alerts"
-• "Stock alerts for sales team"
-• Critical stock notifications
-
-🎯 **What sales operation can I help you with?**
-
-Your message: "{message}"
-"""
\ No newline at end of file
+        return f'{_GENERAL_SALES_PROMPT}Your message: "{message}"\n'
\ No newline at end of file
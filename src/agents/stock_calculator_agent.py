@@ -2,11 +2,366 @@
 Stock Calculator Agent - Specialized agent for inventory calculations and analytics.
 """
 
-from typing import Dict, Any, List, Tuple
+from typing import Callable, Dict, Any, List, NamedTuple, Optional, Tuple
 from src.agents.base_agent import BaseAgent
+from src.agents._product_table import ProductTable
+from src.utils.stock_math import (
+    STOCK_CRITICAL, STOCK_LOW, STOCK_HIGH,
+    classify_cumulative, compute_stock_levels, safe_divide
+)
+from src.tools.base_tool import ToolOutput
 from src.tools.google_sheets_inventory_tool import GoogleSheetsInventoryTool, GoogleSheetsInventoryInput
 from src.tools.calculator_tool import CalculatorTool, CalculatorInput
 import math
+import re
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+
+import numpy as np
+
+
+# Seconds a fetched inventory snapshot is reused across reports while no tool writes to the sheet;
+# this only bounds how long edits made outside this process can go unseen
+_INVENTORY_CACHE_TTL = 30
+
+# Most recent product, category and ABC reports kept for repeated questions
+_REPORT_CACHE_SIZE = 64
+
+# Keyword groups for _classify_calculation_request(). The lookahead makes finditer test
+# every position, so each group is reported even when keywords overlap.
+_CALCULATION_KEYWORDS_RE = re.compile(
+    r"(?=(?P<combined_report>dashboard|all reports|all calculations)"
+    r"|(?P<reorder_points>reorder|when to order)"
+    r"|(?P<inventory_value>inventory value|total value|worth)"
+    r"|(?P<turnover_analysis>turnover|rotation|velocity)"
+    r"|(?P<optimal_stock>optimal|best stock|recommended)"
+    r"|(?P<financial_report>financial|profit)"
+    r"|(?P<calculate>calculate|metrics)"
+    r"|(?P<product>product|item)"
+    r"|(?P<category_calculation>category|electronics|audio|accessories)"
+    r"|(?P<abc_analysis>abc|pareto))"
+)
+
+# Product IDs such as LAPTOP001: letters followed by digits
+_PRODUCT_ID_RE = re.compile(r'\b[A-Za-z]+\d+\b')
+
+# Calculation types in priority order when a message matches several
+_CALCULATION_TYPES = (
+    "combined_report", "reorder_points", "inventory_value", "turnover_analysis", "optimal_stock",
+    "financial_report", "product_calculation", "category_calculation", "abc_analysis"
+)
+
+# Base daily demand by lower-cased category; other categories use the first keyword they contain
+_CATEGORY_BASE_DEMAND = {"electronics": 2.0, "audio": 1.5, "accessories": 3.0}
+_DEFAULT_BASE_DEMAND = 1.0
+
+# Categories recognised in messages, checked in this order, with their display names
+_MESSAGE_CATEGORIES = tuple((category, category.title()) for category in ("electronics", "audio", "accessories"))
+
+# Demand price bands: a price above _PRICE_BREAKS[i - 1] and up to _PRICE_BREAKS[i] gets _PRICE_FACTORS[i]
+_PRICE_BREAKS = np.array([100.0, 500.0, 1000.0])
+_PRICE_FACTORS = np.array([1.2, 0.8, 0.5, 0.3])
+
+# Turnover ratios at or above each break move up one speed class
+_TURNOVER_BREAKS = np.array([1.0, 4.0, 12.0])
+_TURNOVER_SPEEDS = ("Very Slow", "Slow", "Medium", "Fast")
+_SLOW_TURNOVER, _FAST_TURNOVER = 1, 3
+
+# Cumulative annual value percentages closing ABC classes A and B; the rest is class C
+_ABC_BREAKS = np.array([80.0, 95.0])
+
+# Fewest products ranked before falling back to sorting the whole catalogue for ABC classes
+_ABC_MIN_CANDIDATES = 50
+
+# Assumed cost of placing one order, used by the EOQ calculations
+_ORDERING_COST = 50.0
+
+# Report headers, rendered with str.format_map() from the computed figures
+_REORDER_HEADER = """📊 **REORDER POINT CALCULATIONS**
+═══════════════════════════════════════
+
+⚙️ **Parameters Used:**
+• Lead Time: {lead_time_days} days
+• Safety Stock: {safety_stock_days} days
+• Service Level: {service_level:.0f}%
+
+🔄 **Reorder Recommendations:**
+"""
+
+_INVENTORY_VALUE_HEADER = """💰 **INVENTORY VALUE ANALYSIS**
+═══════════════════════════════════════
+
+📊 **Total Inventory Metrics:**
+• Total Products: {products:,}
+• Total Units: {total_units:,}
+• Total Inventory Value: ${total_value:,.2f}
+• Average Value per Product: ${value_per_product:,.2f}
+• Average Value per Unit: ${value_per_unit:.2f}
+
+💸 **Carrying Cost Analysis:**
+• Annual Carrying Cost ({carrying_cost_rate:.0f}%): ${annual_carrying_cost:,.2f}
+• Monthly Carrying Cost: ${monthly_carrying_cost:,.2f}
+• Daily Carrying Cost: ${daily_carrying_cost:.2f}
+
+📂 **Value by Category:**"""
+
+_TURNOVER_HEADER = """🔄 **INVENTORY TURNOVER ANALYSIS**
+═══════════════════════════════════════
+
+📊 **Turnover Speed Distribution:**"""
+
+_OPTIMAL_STOCK_HEADER = """⚙️ **OPTIMAL STOCK LEVEL ANALYSIS**
+═══════════════════════════════════════
+
+📋 **Optimization Parameters:**
+• Lead Time: {lead_time_days} days
+• Safety Stock: {safety_stock_days} days
+• Service Level: {service_level:.0f}%
+• Carrying Cost Rate: {carrying_cost_rate:.0f}%
+
+🎯 **STOCK LEVEL RECOMMENDATIONS:**
+"""
+
+_FINANCIAL_HEADER = """💰 **FINANCIAL INVENTORY REPORT**
+═══════════════════════════════════════
+
+📊 **INVENTORY INVESTMENT:**
+• Total Inventory Value: ${total_inventory_value:,.2f}
+• Total Units in Stock: {total_units:,}
+• Average Value per Unit: ${value_per_unit:.2f}
+• Number of SKUs: {products}
+
+💸 **CARRYING COSTS:**
+• Annual Carrying Cost ({carrying_cost_rate:.0f}%): ${annual_carrying_cost:,.2f}
+• Monthly Carrying Cost: ${monthly_carrying_cost:,.2f}
+• Daily Carrying Cost: ${daily_carrying_cost:.2f}
+
+📈 **PROJECTED PERFORMANCE:**
+• Estimated Annual Sales: ${estimated_annual_sales:,.2f}
+• Estimated COGS: ${estimated_cogs:,.2f}
+• Gross Profit: ${gross_profit:,.2f}
+• Net Profit (after carrying costs): ${net_profit:,.2f}
+• Inventory Turnover Ratio: {inventory_turnover:.2f}x per year
+
+📂 **FINANCIAL BREAKDOWN BY CATEGORY:**"""
+
+_PRODUCT_HEADER = """🔢 **PRODUCT CALCULATIONS: {product_name}**
+═══════════════════════════════════════
+
+📦 **BASIC INFORMATION:**
+• Product ID: {product_id}
+• Category: {category}
+• Unit Price: ${price:.2f}
+• Current Stock: {quantity} units
+
+💰 **FINANCIAL METRICS:**
+• Current Inventory Value: ${current_value:,.2f}
+• Estimated Annual Sales: ${annual_sales_value:,.2f}
+• Annual Carrying Cost: ${annual_carrying_cost:.2f}
+• Value per Unit: ${price:.2f}
+
+📊 **DEMAND & TURNOVER:**
+• Estimated Daily Demand: {daily_demand:.2f} units
+• Estimated Annual Demand: {annual_demand:.0f} units
+• Inventory Turnover: {turnover_ratio:.2f}x per year
+• Days of Supply: {days_of_supply:.0f} days
+
+⚙️ **OPTIMIZATION METRICS:**
+• Economic Order Quantity (EOQ): {eoq:.0f} units
+• Reorder Point: {reorder_point:.0f} units
+• Safety Stock: {safety_stock:.0f} units
+• Lead Time Demand: {lead_time_demand:.0f} units
+
+🎯 **RECOMMENDATIONS:**"""
+
+_CATEGORY_HEADER = """📂 **CATEGORY CALCULATIONS: {category}**
+═══════════════════════════════════════
+
+📊 **CATEGORY OVERVIEW:**
+• Total Products: {total_products}
+• Total Units: {total_units:,}
+• Total Value: ${total_value:,.2f}
+• Average Price: ${avg_price:.2f}
+
+💰 **FINANCIAL METRICS:**
+• Annual Carrying Cost: ${annual_carrying_cost:,.2f}
+• Estimated Annual Demand: {total_annual_demand:.0f} units
+• Category Turnover: {category_turnover:.2f}x per year
+• Optimal Reorder Investment: ${total_eoq_investment:,.2f}
+
+📈 **PERFORMANCE ANALYSIS:**"""
+
+_ABC_HEADER = """📊 **ABC INVENTORY ANALYSIS**
+═══════════════════════════════════════
+
+🎯 **ABC CLASSIFICATION RESULTS:**
+
+🅰️ **CLASS A - HIGH VALUE (Top 80% of value)**
+• Products: {a[count]} ({a[percentage]:.1f}% of items)
+• Annual Value: ${a[annual_value]:,.2f}
+• Current Inventory: ${a[current_value]:,.2f}
+• Management Focus: Tight control, frequent review
+
+🅱️ **CLASS B - MEDIUM VALUE (Next 15% of value)**
+• Products: {b[count]} ({b[percentage]:.1f}% of items)
+• Annual Value: ${b[annual_value]:,.2f}
+• Current Inventory: ${b[current_value]:,.2f}
+• Management Focus: Moderate control, periodic review
+
+🅲️ **CLASS C - LOW VALUE (Remaining 5% of value)**
+• Products: {c[count]} ({c[percentage]:.1f}% of items)
+• Annual Value: ${c[annual_value]:,.2f}
+• Current Inventory: ${c[current_value]:,.2f}
+• Management Focus: Simple controls, annual review
+
+📋 **TOP CLASS A ITEMS:**"""
+
+# Static help text; _handle_general_calculation_query() appends the user's message
+_CALCULATION_HELP = """🧮 **Stock Calculator Agent Ready!**
+
+I can perform these calculations:
+
+📊 **Inventory Calculations:**
+• "Calculate reorder points" - When to reorder each product
+• "Calculate inventory values" - Total values and breakdowns
+• "Analyze inventory turnover" - How fast products move
+• "Calculate optimal stock levels" - Min/max recommendations
+
+💰 **Financial Analysis:**
+• "Generate financial report" - Comprehensive financial metrics
+• "Perform ABC analysis" - Classify products by value importance
+• "Show financial dashboard" - All of the inventory-wide reports at once
+
+🔍 **Product-Specific:**
+• "Calculate metrics for LAPTOP001" - Detailed product analysis
+• "Calculate Electronics category" - Category-wide metrics
+
+📈 **What calculations would you like me to perform?**
+
+"""
+
+
+@lru_cache(maxsize=256)
+def _classify_calculation_message(message_lower: str) -> str:
+    """Calculation type for a lower-cased message; the UI buttons resend the same few messages."""
+    # Every keyword group present anywhere in the message
+    found = {match.lastgroup for match in _CALCULATION_KEYWORDS_RE.finditer(message_lower)}
+    
+    if "calculate" in found and "product" in found:
+        found.add("product_calculation")
+    
+    for calculation_type in _CALCULATION_TYPES:
+        if calculation_type in found:
+            return calculation_type
+    return "general"
+
+
+@lru_cache(maxsize=None)
+def _category_base_demand(category: str) -> float:
+    """Base daily demand by category."""
+    category = category.lower()
+    demand = _CATEGORY_BASE_DEMAND.get(category)
+    if demand is not None:
+        return demand
+    
+    # Compound names such as "Home Audio" fall back to a keyword search
+    return next(
+        (demand for keyword, demand in _CATEGORY_BASE_DEMAND.items() if keyword in category),
+        _DEFAULT_BASE_DEMAND
+    )
+
+
+def _daily_demand(price: float, category: str) -> float:
+    """Estimated daily demand for a product; depends only on its price band and category."""
+    return _banded_daily_demand(category, bisect_left(_PRICE_BREAKS, price))
+
+
+@lru_cache(maxsize=256)
+def _banded_daily_demand(category: str, price_band: int) -> float:
+    """Daily demand for a category and _PRICE_BREAKS band; a catalogue has only a handful of these."""
+    # Simplified demand estimation - in practice, use historical sales data
+    base_demand = _category_base_demand(category)
+    
+    # Adjust by price (higher price = lower demand)
+    price_factor = _PRICE_FACTORS.item(price_band)
+    
+    return base_demand * price_factor
+
+
+def _category_totals(codes: np.ndarray, categories: np.ndarray, qty: np.ndarray, value: np.ndarray,
+                     **sums: np.ndarray) -> "pandas.DataFrame":
+    """Per-category products, units, value and any extra column sums, most valuable category first."""
+    import pandas as pd
+    
+    size = len(categories)
+    totals = pd.DataFrame({
+        "products": np.bincount(codes, minlength=size),
+        "units": np.bincount(codes, weights=qty, minlength=size).astype(np.int64),
+        "value": np.bincount(codes, weights=value, minlength=size),
+        **{name: np.bincount(codes, weights=column, minlength=size) for name, column in sums.items()}
+    }, index=categories)
+    return totals.sort_values("value", ascending=False, kind="stable")
+
+
+def _ordered_sum(values: np.ndarray) -> float:
+    """
+    Sum of values added one after another like sum(), not pairwise like ndarray.sum(), so
+    totals printed at a rounding boundary come out the same as the per-product loops gave.
+    """
+    return float(sum(values.tolist()))
+
+
+def _top_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values, largest first, with ties in catalogue order like a stable sort."""
+    if k >= values.size:
+        return np.argsort(-values, kind="stable")
+    
+    kth_largest = np.partition(values, values.size - k)[values.size - k]
+    candidates = np.flatnonzero(values >= kth_largest)
+    return candidates[np.argsort(-values[candidates], kind="stable")][:k]
+
+
+def _abc_classes(annual_value: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rank products by annual value and give each its ABC class (0 = A, 1 = B, 2 = C).
+    
+    Returns the indices of the ranked products, most valuable first, and the class of every
+    product. With non-negative values the running share only grows, so products past the
+    class B boundary are all class C and only the leading candidates need sorting; the
+    whole catalogue is ranked when the boundary falls beyond them.
+    """
+    size = annual_value.size
+    total = float(annual_value.sum())
+    abc_class = np.full(size, 2, dtype=np.int64)
+    
+    if total > 0 and annual_value.min() >= 0:
+        ranked = _top_indices(annual_value, max(_ABC_MIN_CANDIDATES, size * 3 // 10))
+        ranked_class = classify_cumulative(annual_value[ranked], total, _ABC_BREAKS)
+        if ranked.size == size or ranked_class[-1] == 2:
+            abc_class[ranked] = ranked_class
+            return ranked, abc_class
+    
+    ranked = np.argsort(-annual_value, kind="stable")
+    if total > 0:
+        abc_class[ranked] = classify_cumulative(annual_value[ranked], total, _ABC_BREAKS)
+    else:
+        abc_class[:] = 0
+    return ranked, abc_class
+
+
+class _StockLevels(NamedTuple):
+    """Per-product columns returned by StockCalculatorAgent._stock_levels()."""
+    qty: np.ndarray
+    price: np.ndarray
+    daily_demand: np.ndarray
+    eoq: np.ndarray
+    reorder_point: np.ndarray
+    min_stock: np.ndarray
+    max_stock: np.ndarray
+    status: np.ndarray
 
 
 class StockCalculatorAgent(BaseAgent):
@@ -37,6 +392,15 @@ class StockCalculatorAgent(BaseAgent):
         self.safety_stock_days = 3  # Extra days of stock for safety
         self.target_service_level = 0.95  # 95% service level
         self.carrying_cost_rate = 0.20  # 20% annual carrying cost
+        
+        # (sheet write version, fetched_at, list_all result, ProductTable) shared by the catalogue-wide reports
+        self._inventory_cache = None
+        
+        # (business parameters, compute_stock_levels bound to them), rebuilt when a parameter changes
+        self._stock_kernel = None
+        
+        # report key -> (signature of the products and parameters it was built from, report)
+        self._report_cache = OrderedDict()
     
     def process_message(self, message: str) -> str:
         """Process stock calculation requests."""
@@ -46,7 +410,9 @@ class StockCalculatorAgent(BaseAgent):
             # Determine what calculation to perform
             calculation_type = self._classify_calculation_request(message)
             
-            if calculation_type == "reorder_points":
+            if calculation_type == "combined_report":
+                response = self._generate_combined_report()
+            elif calculation_type == "reorder_points":
                 response = self._calculate_reorder_points()
             elif calculation_type == "inventory_value":
                 response = self._calculate_inventory_values()
@@ -73,117 +439,159 @@ class StockCalculatorAgent(BaseAgent):
         self.conversation_history.append({"role": "assistant", "content": response})
         return response
     
+    def _list_all_products(self) -> ToolOutput:
+        """
+        List all products, reusing the snapshot while no tool has written to the sheet since it
+        was fetched and it is less than _INVENTORY_CACHE_TTL seconds old.
+        """
+        # Read before fetching, so a write made during the fetch leaves the snapshot stale
+        version = self.inventory_tool.write_version()
+        now = time.monotonic()
+        cache = self._inventory_cache
+        if cache is not None and cache[0] == version and now - cache[1] < _INVENTORY_CACHE_TTL:
+            return cache[2]
+        
+        result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="list_all"))
+        if result.success:
+            self._inventory_cache = (version, now, result, ProductTable.from_tool_result(result.result))
+        return result
+    
+    def _product_signature(self, product: Dict[str, Any]) -> tuple:
+        """The product fields and business parameters a cached product report depends on."""
+        return (
+            self.lead_time_days, self.safety_stock_days, self.carrying_cost_rate,
+            product["product_id"], product["product_name"], product["category"], product["quantity"], product["price"]
+        )
+    
+    def _snapshot_signature(self, result: ToolOutput) -> Optional[tuple]:
+        """
+        The snapshot and business parameters a cached catalogue report depends on, or None
+        when result is not the cached snapshot (the report is then not cached).
+        """
+        cache = self._inventory_cache
+        if cache is None or cache[2] is not result:
+            return None
+        # The write version and fetch time identify the snapshot without reading its rows
+        return (self.lead_time_days, self.safety_stock_days, self.carrying_cost_rate, cache[0], cache[1])
+    
+    def _cached_report(self, key: tuple, signature: Optional[tuple]) -> str:
+        """Report stored under key if it was built from the same signature, else an empty string."""
+        cached = self._report_cache.get(key)
+        if signature is None or cached is None or cached[0] != signature:
+            return ""
+        self._report_cache.move_to_end(key)
+        return cached[1]
+    
+    def _store_report(self, key: tuple, signature: Optional[tuple], report: str) -> str:
+        """Remember a report, evicting the least recently used beyond _REPORT_CACHE_SIZE."""
+        if signature is None:
+            return report
+        self._report_cache[key] = (signature, report)
+        self._report_cache.move_to_end(key)
+        if len(self._report_cache) > _REPORT_CACHE_SIZE:
+            self._report_cache.popitem(last=False)
+        return report
+    
+    def _product_table(self, products: List[Dict[str, Any]]) -> ProductTable:
+        """Column table for products, reused when they are the cached snapshot."""
+        cache = self._inventory_cache
+        if cache is not None and cache[2].result is products:
+            return cache[3]
+        return ProductTable.from_tool_result(products)
+    
+    def _parameter_fields(self) -> Dict[str, Any]:
+        """Business parameters as report header fields."""
+        return {
+            "lead_time_days": self.lead_time_days,
+            "safety_stock_days": self.safety_stock_days,
+            "service_level": self.target_service_level * 100,
+            "carrying_cost_rate": self.carrying_cost_rate * 100
+        }
+    
+    def _stock_levels(self, table: ProductTable) -> "_StockLevels":
+        """Demand, EOQ and stock level columns for a product table under the current business parameters."""
+        daily_demand = self._estimate_daily_demand_array(table.price, *table.group_by_category())
+        levels = self._stock_level_kernel()(table.qty, daily_demand, table.price)
+        return _StockLevels(table.qty, table.price, daily_demand, *levels)
+    
+    def _stock_level_kernel(self) -> Callable[..., Tuple[np.ndarray, ...]]:
+        """compute_stock_levels() with the business parameters bound, reused until one of them changes."""
+        params = (float(self.lead_time_days), float(self.safety_stock_days), float(self.carrying_cost_rate))
+        kernel = self._stock_kernel
+        if kernel is None or kernel[0] != params:
+            lead, safety, carry = params
+            kernel = self._stock_kernel = (
+                params,
+                partial(compute_stock_levels, lead=lead, safety=safety, carry=carry, ord_cost=_ORDERING_COST)
+            )
+        return kernel[1]
+    
     def _classify_calculation_request(self, message: str) -> str:
         """Classify the type of calculation request."""
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ['reorder', 'reorder point', 'when to order']):
-            return "reorder_points"
-        elif any(word in message_lower for word in ['inventory value', 'total value', 'worth']):
-            return "inventory_value"
-        elif any(word in message_lower for word in ['turnover', 'rotation', 'velocity']):
-            return "turnover_analysis"
-        elif any(word in message_lower for word in ['optimal', 'best stock', 'recommended']):
-            return "optimal_stock"
-        elif any(word in message_lower for word in ['financial report', 'financial', 'profit']):
-            return "financial_report"
-        elif any(word in message_lower for word in ['calculate', 'metrics']) and any(word in message_lower for word in ['product', 'item']):
-            return "product_calculation"
-        elif any(word in message_lower for word in ['category', 'electronics', 'audio', 'accessories']):
-            return "category_calculation"
-        elif any(word in message_lower for word in ['abc', 'abc analysis', 'pareto']):
-            return "abc_analysis"
-        else:
-            return "general"
+        return _classify_calculation_message(message.lower())
     
     def _calculate_reorder_points(self) -> str:
         """Calculate reorder points for all products."""
         try:
-            result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="list_all"))
+            result = self._list_all_products()
             
             if not result.success:
                 return f"❌ Could not retrieve inventory data: {result.error}"
             
             products = result.result
-            reorder_calculations = []
+            levels = self._stock_levels(self._product_table(products))
+            qty, daily_demand, eoq, reorder_point = levels.qty, levels.daily_demand, levels.eoq, levels.reorder_point
             
-            for product in products:
-                # Estimate daily demand (simplified - in practice use historical data)
-                daily_demand = self._estimate_daily_demand(product)
-                
-                # Calculate reorder point: (Lead time × Daily demand) + Safety stock
-                lead_time_demand = daily_demand * self.lead_time_days
-                safety_stock = daily_demand * self.safety_stock_days
-                reorder_point = lead_time_demand + safety_stock
-                
-                # Calculate economic order quantity (EOQ)
-                eoq = self._calculate_eoq(product, daily_demand * 365)  # Annual demand
-                
-                # Determine if reorder is needed
-                current_stock = product["quantity"]
-                needs_reorder = current_stock <= reorder_point
-                
-                reorder_calculations.append({
-                    "product": product,
-                    "daily_demand": daily_demand,
-                    "reorder_point": reorder_point,
-                    "eoq": eoq,
-                    "current_stock": current_stock,
-                    "needs_reorder": needs_reorder,
-                    "shortage": max(0, reorder_point - current_stock) if needs_reorder else 0
-                })
-            
-            # Sort by urgency (most urgent first)
-            reorder_calculations.sort(key=lambda x: (-x["shortage"], x["needs_reorder"]))
+            # Determine if reorder is needed, most urgent (largest shortage) first
+            needs_reorder = qty <= reorder_point
+            shortage = np.where(needs_reorder, np.maximum(0, reorder_point - qty), 0)
+            urgent_reorders = np.flatnonzero(needs_reorder)
+            urgent_reorders = urgent_reorders[np.argsort(-shortage[urgent_reorders], kind="stable")]
+            healthy_stock = np.flatnonzero(~needs_reorder)
             
             # Generate report
-            report = f"""📊 **REORDER POINT CALCULATIONS**
-═══════════════════════════════════════
-
-⚙️ **Parameters Used:**
-• Lead Time: {self.lead_time_days} days
-• Safety Stock: {self.safety_stock_days} days
-• Service Level: {self.target_service_level*100:.0f}%
-
-🔄 **Reorder Recommendations:**
-"""
-            
-            urgent_reorders = [calc for calc in reorder_calculations if calc["needs_reorder"]]
-            
-            if urgent_reorders:
-                report += f"\n🚨 **URGENT REORDERS NEEDED ({len(urgent_reorders)} items):**\n"
-                for calc in urgent_reorders:
-                    product = calc["product"]
-                    shortage = calc["shortage"]
-                    eoq = calc["eoq"]
+            parts = [_REORDER_HEADER.format_map(self._parameter_fields())]
+            append = parts.append
+            
+            if urgent_reorders.size:
+                append(f"\n🚨 **URGENT REORDERS NEEDED ({urgent_reorders.size} items):**\n")
+                # Convert the printed columns to Python floats once rather than per line
+                rows = zip(
+                    urgent_reorders.tolist(),
+                    reorder_point[urgent_reorders].tolist(),
+                    shortage[urgent_reorders].tolist(),
+                    eoq[urgent_reorders].tolist()
+                )
+                for i, product_reorder_point, product_shortage, order_quantity in rows:
+                    product = products[i]
                     
-                    report += f"\n• **{product['product_name']}** ({product['product_id']})\n"
-                    report += f"  Current Stock: {calc['current_stock']} units\n"
-                    report += f"  Reorder Point: {calc['reorder_point']:.0f} units\n"
-                    report += f"  Shortage: {shortage:.0f} units\n"
-                    report += f"  Recommended Order: {eoq:.0f} units\n"
-                    report += f"  Order Cost: ${eoq * product['price']:,.2f}\n"
+                    append(
+                        f"\n• **{product['product_name']}** ({product['product_id']})\n"
+                        f"  Current Stock: {product['quantity']} units\n"
+                        f"  Reorder Point: {product_reorder_point:.0f} units\n"
+                        f"  Shortage: {product_shortage:.0f} units\n"
+                        f"  Recommended Order: {order_quantity:.0f} units\n"
+                        f"  Order Cost: ${order_quantity * product['price']:,.2f}\n"
+                    )
             
             # Show products with healthy stock
-            healthy_stock = [calc for calc in reorder_calculations if not calc["needs_reorder"]]
-            if healthy_stock:
-                report += f"\n✅ **HEALTHY STOCK LEVELS ({len(healthy_stock)} items):**\n"
-                for calc in healthy_stock[:5]:  # Show first 5
-                    product = calc["product"]
-                    days_until_reorder = (calc["current_stock"] - calc["reorder_point"]) / calc["daily_demand"]
-                    report += f"• {product['product_name']}: {days_until_reorder:.0f} days until reorder\n"
+            if healthy_stock.size:
+                append(f"\n✅ **HEALTHY STOCK LEVELS ({healthy_stock.size} items):**\n")
+                for i in healthy_stock[:5]:  # Show first 5
+                    days_until_reorder = (qty[i] - reorder_point[i]) / daily_demand[i]
+                    append(f"• {products[i]['product_name']}: {days_until_reorder:.0f} days until reorder\n")
                 
-                if len(healthy_stock) > 5:
-                    report += f"• ... and {len(healthy_stock) - 5} more items with healthy stock\n"
+                if healthy_stock.size > 5:
+                    append(f"• ... and {healthy_stock.size - 5} more items with healthy stock\n")
             
             # Summary calculations
-            total_reorder_cost = sum(calc["eoq"] * calc["product"]["price"] for calc in urgent_reorders)
-            report += f"\n💰 **FINANCIAL SUMMARY:**\n"
-            report += f"• Total Reorder Investment: ${total_reorder_cost:,.2f}\n"
-            report += f"• Items Needing Reorder: {len(urgent_reorders)}\n"
-            report += f"• Items with Healthy Stock: {len(healthy_stock)}\n"
+            total_reorder_cost = _ordered_sum(eoq[urgent_reorders] * levels.price[urgent_reorders])
+            append(f"\n💰 **FINANCIAL SUMMARY:**\n")
+            append(f"• Total Reorder Investment: ${total_reorder_cost:,.2f}\n")
+            append(f"• Items Needing Reorder: {urgent_reorders.size}\n")
+            append(f"• Items with Healthy Stock: {healthy_stock.size}\n")
             
-            return report
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ Error calculating reorder points: {str(e)}"
@@ -191,75 +599,68 @@ class StockCalculatorAgent(BaseAgent):
     def _calculate_inventory_values(self) -> str:
         """Calculate comprehensive inventory values."""
         try:
-            result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="list_all"))
+            result = self._list_all_products()
             
             if not result.success:
                 return f"❌ Could not retrieve inventory data: {result.error}"
             
             products = result.result
             
+            table = self._product_table(products)
+            qty, price, value = table.qty, table.price, table.value
+            codes, categories = table.group_by_category()
+            
             # Calculate various inventory values
-            total_units = sum(p["quantity"] for p in products)
-            total_value = sum(p["quantity"] * p["price"] for p in products)
+            total_units = int(qty.sum())
+            total_value = _ordered_sum(value)
             
             # Category breakdown
-            category_values = {}
-            for product in products:
-                category = product["category"]
-                if category not in category_values:
-                    category_values[category] = {"units": 0, "value": 0, "products": 0}
-                
-                category_values[category]["units"] += product["quantity"]
-                category_values[category]["value"] += product["quantity"] * product["price"]
-                category_values[category]["products"] += 1
+            category_values = _category_totals(codes, categories, qty, value)
             
             # Calculate carrying costs
             annual_carrying_cost = total_value * self.carrying_cost_rate
             monthly_carrying_cost = annual_carrying_cost / 12
             
-            # Find most/least valuable items
-            products_by_value = sorted(products, key=lambda x: x["quantity"] * x["price"], reverse=True)
-            
-            report = f"""💰 **INVENTORY VALUE ANALYSIS**
-═══════════════════════════════════════
+            # Find the most valuable items without sorting the whole catalogue
+            top_by_value = _top_indices(value, 10)
+            
+            parts = [_INVENTORY_VALUE_HEADER.format_map({
+                **self._parameter_fields(),
+                "products": len(products),
+                "total_units": total_units,
+                "total_value": total_value,
+                "value_per_product": total_value / len(products),
+                "value_per_unit": total_value / total_units,
+                "annual_carrying_cost": annual_carrying_cost,
+                "monthly_carrying_cost": monthly_carrying_cost,
+                "daily_carrying_cost": annual_carrying_cost / 365
+            })]
+            append = parts.append
 
-📊 **Total Inventory Metrics:**
-• Total Products: {len(products):,}
-• Total Units: {total_units:,}
-• Total Inventory Value: ${total_value:,.2f}
-• Average Value per Product: ${total_value/len(products):,.2f}
-• Average Value per Unit: ${total_value/total_units:.2f}
-
-💸 **Carrying Cost Analysis:**
-• Annual Carrying Cost ({self.carrying_cost_rate*100:.0f}%): ${annual_carrying_cost:,.2f}
-• Monthly Carrying Cost: ${monthly_carrying_cost:,.2f}
-• Daily Carrying Cost: ${annual_carrying_cost/365:.2f}
-
-📂 **Value by Category:**"""
-
-            for category, data in sorted(category_values.items(), key=lambda x: x[1]["value"], reverse=True):
-                percentage = (data["value"] / total_value * 100) if total_value > 0 else 0
-                avg_value = data["value"] / data["products"] if data["products"] > 0 else 0
+            for category, data_products, data_units, data_value in category_values.itertuples(name=None):
+                percentage = (data_value / total_value * 100) if total_value > 0 else 0
+                avg_value = data_value / data_products if data_products > 0 else 0
                 
-                report += f"\n• **{category}**: ${data['value']:,.2f} ({percentage:.1f}%)"
-                report += f"\n  └─ {data['products']} products, {data['units']:,} units, avg ${avg_value:,.2f}/product"
+                append(f"\n• **{category}**: ${data_value:,.2f} ({percentage:.1f}%)")
+                append(f"\n  └─ {data_products} products, {data_units:,} units, avg ${avg_value:,.2f}/product")
             
-            report += f"\n\n🏆 **Top 5 Most Valuable Items:**"
-            for i, product in enumerate(products_by_value[:5], 1):
-                item_value = product["quantity"] * product["price"]
+            append(f"\n\n🏆 **Top 5 Most Valuable Items:**")
+            for i, index in enumerate(top_by_value[:5], 1):
+                product = products[index]
+                item_value = float(value[index])
                 percentage = (item_value / total_value * 100) if total_value > 0 else 0
-                report += f"\n{i}. {product['product_name']}: ${item_value:,.2f} ({percentage:.1f}%)"
-                report += f"\n   └─ {product['quantity']} units × ${product['price']:.2f}"
+                append(f"\n{i}. {product['product_name']}: ${item_value:,.2f} ({percentage:.1f}%)")
+                append(f"\n   └─ {product['quantity']} units × ${product['price']:.2f}")
             
             # Calculate inventory concentration
-            top_10_value = sum(p["quantity"] * p["price"] for p in products_by_value[:10])
+            top_10_value = _ordered_sum(value[top_by_value])
             concentration = (top_10_value / total_value * 100) if total_value > 0 else 0
             
-            report += f"\n\n📈 **Inventory Concentration:**"
-            report += f"\n• Top 10 items represent {concentration:.1f}% of total value"
-            report += f"\n• Inventory diversity: {len(products)} different products"
+            append(f"\n\n📈 **Inventory Concentration:**")
+            append(f"\n• Top 10 items represent {concentration:.1f}% of total value")
+            append(f"\n• Inventory diversity: {len(products)} different products")
             
-            return report
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ Error calculating inventory values: {str(e)}"
@@ -267,105 +668,72 @@ class StockCalculatorAgent(BaseAgent):
     def _analyze_inventory_turnover(self) -> str:
         """Analyze inventory turnover rates (simplified calculation)."""
         try:
-            result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="list_all"))
+            result = self._list_all_products()
             
             if not result.success:
                 return f"❌ Could not retrieve inventory data: {result.error}"
             
             products = result.result
+            table = self._product_table(products)
+            qty, price, value = table.qty, table.price, table.value
+            codes, categories = table.group_by_category()
             
             # Estimate turnover rates (in practice, use historical sales data)
-            turnover_analysis = []
+            estimated_annual_demand = self._estimate_daily_demand_array(price, codes, categories) * 365
+            turnover_ratio = safe_divide(estimated_annual_demand, qty, np.inf)
+            # Out-of-stock items have infinite turnover and so zero days of supply
+            days_of_supply = safe_divide(365.0, turnover_ratio, 999.0)
             
-            for product in products:
-                # Estimate annual demand based on price and category
-                estimated_annual_demand = self._estimate_annual_demand(product)
-                current_stock = product["quantity"]
-                
-                # Calculate turnover ratio
-                if current_stock > 0:
-                    turnover_ratio = estimated_annual_demand / current_stock
-                    days_of_supply = 365 / turnover_ratio if turnover_ratio > 0 else 999
-                else:
-                    turnover_ratio = float('inf')
-                    days_of_supply = 0
-                
-                # Classify turnover speed
-                if turnover_ratio >= 12:  # Monthly turnover
-                    speed = "Fast"
-                elif turnover_ratio >= 4:   # Quarterly turnover
-                    speed = "Medium"
-                elif turnover_ratio >= 1:   # Annual turnover
-                    speed = "Slow"
-                else:
-                    speed = "Very Slow"
-                
-                turnover_analysis.append({
-                    "product": product,
-                    "turnover_ratio": turnover_ratio,
-                    "days_of_supply": days_of_supply,
-                    "speed": speed,
-                    "estimated_annual_demand": estimated_annual_demand
-                })
-            
-            # Sort by turnover ratio
-            turnover_analysis.sort(key=lambda x: x["turnover_ratio"], reverse=True)
+            # Classify turnover speed: index into _TURNOVER_SPEEDS
+            speed = np.searchsorted(_TURNOVER_BREAKS, turnover_ratio, side="right")
             
             # Generate report
-            report = f"""🔄 **INVENTORY TURNOVER ANALYSIS**
-═══════════════════════════════════════
-
-📊 **Turnover Speed Distribution:**"""
+            parts = [_TURNOVER_HEADER]
+            append = parts.append
             
-            speed_counts = {}
-            for analysis in turnover_analysis:
-                speed = analysis["speed"]
-                speed_counts[speed] = speed_counts.get(speed, 0) + 1
+            speed_counts = np.bincount(speed, minlength=len(_TURNOVER_SPEEDS))
             
-            for speed in ["Fast", "Medium", "Slow", "Very Slow"]:
-                count = speed_counts.get(speed, 0)
+            for speed_index in range(len(_TURNOVER_SPEEDS) - 1, -1, -1):
+                count = int(speed_counts[speed_index])
                 percentage = (count / len(products) * 100) if products else 0
-                report += f"\n• {speed} Movers: {count} products ({percentage:.1f}%)"
+                append(f"\n• {_TURNOVER_SPEEDS[speed_index]} Movers: {count} products ({percentage:.1f}%)")
             
-            report += f"\n\n🚀 **FAST MOVERS (High Turnover):**"
-            fast_movers = [a for a in turnover_analysis if a["speed"] == "Fast"]
+            append(f"\n\n🚀 **FAST MOVERS (High Turnover):**")
+            fast_movers = np.flatnonzero(speed == _FAST_TURNOVER)
             
-            if fast_movers:
-                for analysis in fast_movers[:5]:  # Top 5
-                    product = analysis["product"]
-                    report += f"\n• **{product['product_name']}**"
-                    report += f"\n  └─ Turnover: {analysis['turnover_ratio']:.1f}x/year, {analysis['days_of_supply']:.0f} days supply"
+            if fast_movers.size:
+                # Highest turnover first
+                for index in fast_movers[_top_indices(turnover_ratio[fast_movers], 5)]:
+                    append(f"\n• **{products[index]['product_name']}**")
+                    append(f"\n  └─ Turnover: {turnover_ratio[index]:.1f}x/year, {days_of_supply[index]:.0f} days supply")
             else:
-                report += "\n• No fast-moving items identified"
+                append("\n• No fast-moving items identified")
             
-            report += f"\n\n🐌 **SLOW MOVERS (Low Turnover):**"
-            slow_movers = [a for a in turnover_analysis if a["speed"] in ["Slow", "Very Slow"]]
+            append(f"\n\n🐌 **SLOW MOVERS (Low Turnover):**")
+            slow_movers = np.flatnonzero(speed <= _SLOW_TURNOVER)
             
-            if slow_movers:
+            if slow_movers.size:
                 # Show slowest movers
-                slowest = sorted(slow_movers, key=lambda x: x["turnover_ratio"])[:5]
-                for analysis in slowest:
-                    product = analysis["product"]
-                    tied_up_capital = product["quantity"] * product["price"]
-                    report += f"\n• **{product['product_name']}**"
-                    report += f"\n  └─ {analysis['days_of_supply']:.0f} days supply, ${tied_up_capital:,.2f} tied up"
+                for index in slow_movers[_top_indices(-turnover_ratio[slow_movers], 5)]:
+                    append(f"\n• **{products[index]['product_name']}**")
+                    append(f"\n  └─ {days_of_supply[index]:.0f} days supply, ${value[index]:,.2f} tied up")
             else:
-                report += "\n• No slow-moving items identified"
+                append("\n• No slow-moving items identified")
             
             # Calculate overall metrics
-            total_value = sum(p["quantity"] * p["price"] for p in products)
-            weighted_turnover = sum(
-                (a["product"]["quantity"] * a["product"]["price"] * a["turnover_ratio"]) / total_value
-                for a in turnover_analysis if a["turnover_ratio"] != float('inf')
+            total_value = _ordered_sum(value)
+            finite = np.isfinite(turnover_ratio)
+            weighted_turnover = _ordered_sum(
+                value[finite] * turnover_ratio[finite] / total_value
             ) if total_value > 0 else 0
             
-            report += f"\n\n📈 **OVERALL TURNOVER METRICS:**"
-            report += f"\n• Weighted Average Turnover: {weighted_turnover:.2f}x per year"
-            report += f"\n• Average Days of Supply: {365/weighted_turnover:.0f} days"
-            report += f"\n• Fast Movers: {len(fast_movers)} items"
-            report += f"\n• Slow Movers: {len(slow_movers)} items"
+            append(f"\n\n📈 **OVERALL TURNOVER METRICS:**")
+            append(f"\n• Weighted Average Turnover: {weighted_turnover:.2f}x per year")
+            append(f"\n• Average Days of Supply: {365/weighted_turnover:.0f} days")
+            append(f"\n• Fast Movers: {fast_movers.size} items")
+            append(f"\n• Slow Movers: {slow_movers.size} items")
             
-            return report
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ Error analyzing inventory turnover: {str(e)}"
@@ -373,125 +741,77 @@ class StockCalculatorAgent(BaseAgent):
     def _calculate_optimal_stock_levels(self) -> str:
         """Calculate optimal stock levels for all products."""
         try:
-            result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="list_all"))
+            result = self._list_all_products()
             
             if not result.success:
                 return f"❌ Could not retrieve inventory data: {result.error}"
             
             products = result.result
-            optimization_results = []
+            table = self._product_table(products)
+            levels = self._stock_levels(table)
+            status = levels.status
             
-            for product in products:
-                # Calculate optimal parameters
-                daily_demand = self._estimate_daily_demand(product)
-                annual_demand = daily_demand * 365
-                
-                # Economic Order Quantity (EOQ)
-                eoq = self._calculate_eoq(product, annual_demand)
-                
-                # Reorder point
-                reorder_point = (daily_demand * self.lead_time_days) + (daily_demand * self.safety_stock_days)
-                
-                # Maximum stock level
-                max_stock = reorder_point + eoq
-                
-                # Minimum stock level (safety stock)
-                min_stock = daily_demand * self.safety_stock_days
-                
-                # Current vs optimal analysis
-                current_stock = product["quantity"]
-                
-                if current_stock < min_stock:
-                    status = "CRITICAL - Below minimum"
-                    action = f"Order {eoq:.0f} units immediately"
-                elif current_stock < reorder_point:
-                    status = "LOW - Below reorder point"
-                    action = f"Order {eoq:.0f} units soon"
-                elif current_stock > max_stock:
-                    status = "HIGH - Above maximum"
-                    action = "Consider reducing orders"
-                else:
-                    status = "OPTIMAL - Within range"
-                    action = "No action needed"
-                
-                optimization_results.append({
-                    "product": product,
-                    "current_stock": current_stock,
-                    "min_stock": min_stock,
-                    "reorder_point": reorder_point,
-                    "max_stock": max_stock,
-                    "eoq": eoq,
-                    "status": status,
-                    "action": action,
-                    "daily_demand": daily_demand
-                })
-            
-            # Sort by priority (critical items first)
-            optimization_results.sort(key=lambda x: (
-                "CRITICAL" not in x["status"],
-                "LOW" not in x["status"],
-                x["product"]["product_name"]
-            ))
+            # Sort by priority (critical items first), then by name, and split into status groups
+            order = np.lexsort((table.names, status))
+            group_ends = np.searchsorted(status[order], [STOCK_CRITICAL, STOCK_LOW, STOCK_HIGH], side="right")
+            critical_items, low_items, high_items, optimal_items = np.split(order, group_ends)
+            optimal_count = optimal_items.size
             
             # Generate report
-            report = f"""⚙️ **OPTIMAL STOCK LEVEL ANALYSIS**
-═══════════════════════════════════════
-
-📋 **Optimization Parameters:**
-• Lead Time: {self.lead_time_days} days
-• Safety Stock: {self.safety_stock_days} days
-• Service Level: {self.target_service_level*100:.0f}%
-• Carrying Cost Rate: {self.carrying_cost_rate*100:.0f}%
-
-🎯 **STOCK LEVEL RECOMMENDATIONS:**
-"""
-            
-            # Group by status
-            critical_items = [r for r in optimization_results if "CRITICAL" in r["status"]]
-            low_items = [r for r in optimization_results if "LOW" in r["status"]]
-            high_items = [r for r in optimization_results if "HIGH" in r["status"]]
-            optimal_items = [r for r in optimization_results if "OPTIMAL" in r["status"]]
-            
-            if critical_items:
-                report += f"\n🚨 **CRITICAL ITEMS ({len(critical_items)}):**\n"
-                for result in critical_items:
-                    product = result["product"]
-                    report += f"\n• **{product['product_name']}** ({product['product_id']})\n"
-                    report += f"  Current: {result['current_stock']} | Min: {result['min_stock']:.0f} | Reorder: {result['reorder_point']:.0f} | Max: {result['max_stock']:.0f}\n"
-                    report += f"  Action: {result['action']}\n"
-            
-            if low_items:
-                report += f"\n⚠️ **LOW STOCK ITEMS ({len(low_items)}):**\n"
-                for result in low_items[:5]:  # Show top 5
-                    product = result["product"]
-                    report += f"• {product['product_name']}: {result['current_stock']} → Order {result['eoq']:.0f} units\n"
+            parts = [_OPTIMAL_STOCK_HEADER.format_map(self._parameter_fields())]
+            append = parts.append
+            
+            if critical_items.size:
+                append(f"\n🚨 **CRITICAL ITEMS ({len(critical_items)}):**\n")
+                # Convert the printed columns to Python floats once rather than per line
+                rows = zip(
+                    critical_items.tolist(),
+                    levels.min_stock[critical_items].tolist(),
+                    levels.reorder_point[critical_items].tolist(),
+                    levels.max_stock[critical_items].tolist(),
+                    levels.eoq[critical_items].tolist()
+                )
+                for i, min_stock, reorder_point, max_stock, order_quantity in rows:
+                    product = products[i]
+                    append(
+                        f"\n• **{product['product_name']}** ({product['product_id']})\n"
+                        f"  Current: {product['quantity']} | Min: {min_stock:.0f} | Reorder: {reorder_point:.0f} | Max: {max_stock:.0f}\n"
+                        f"  Action: Order {order_quantity:.0f} units immediately\n"
+                    )
+            
+            if low_items.size:
+                append(f"\n⚠️ **LOW STOCK ITEMS ({len(low_items)}):**\n")
+                for i in low_items[:5]:  # Show top 5
+                    product = products[i]
+                    append(f"• {product['product_name']}: {product['quantity']} → Order {levels.eoq[i]:.0f} units\n")
                 if len(low_items) > 5:
-                    report += f"• ... and {len(low_items) - 5} more items\n"
+                    append(f"• ... and {len(low_items) - 5} more items\n")
             
-            if high_items:
-                report += f"\n📦 **OVERSTOCKED ITEMS ({len(high_items)}):**\n"
+            if high_items.size:
+                append(f"\n📦 **OVERSTOCKED ITEMS ({len(high_items)}):**\n")
                 excess_value = 0
-                for result in high_items[:5]:  # Show top 5
-                    product = result["product"]
-                    excess = result["current_stock"] - result["max_stock"]
+                for i in high_items[:5]:  # Show top 5
+                    product = products[i]
+                    excess = product["quantity"] - levels.max_stock[i]
                     excess_value += excess * product["price"]
-                    report += f"• {product['product_name']}: {excess:.0f} units excess (${excess * product['price']:,.2f})\n"
+                    append(f"• {product['product_name']}: {excess:.0f} units excess (${excess * product['price']:,.2f})\n")
                 if len(high_items) > 5:
-                    report += f"• ... and {len(high_items) - 5} more items\n"
-                report += f"  Total Excess Value: ${excess_value:,.2f}\n"
+                    append(f"• ... and {len(high_items) - 5} more items\n")
+                append(f"  Total Excess Value: ${excess_value:,.2f}\n")
             
-            report += f"\n✅ **OPTIMALLY STOCKED ({len(optimal_items)} items)**\n"
+            append(f"\n✅ **OPTIMALLY STOCKED ({optimal_count} items)**\n")
             
             # Summary calculations
-            total_reorder_investment = sum(r["eoq"] * r["product"]["price"] for r in critical_items + low_items)
+            needs_order = np.concatenate((critical_items, low_items))
+            total_reorder_investment = _ordered_sum(levels.eoq[needs_order] * levels.price[needs_order])
             
-            report += f"\n💰 **FINANCIAL IMPACT:**\n"
-            report += f"• Required Investment: ${total_reorder_investment:,.2f}\n"
-            report += f"• Items Needing Orders: {len(critical_items) + len(low_items)}\n"
-            report += f"• Overstocked Items: {len(high_items)}\n"
-            report += f"• Optimally Stocked: {len(optimal_items)}\n"
+            append(f"\n💰 **FINANCIAL IMPACT:**\n")
+            append(f"• Required Investment: ${total_reorder_investment:,.2f}\n")
+            append(f"• Items Needing Orders: {len(critical_items) + len(low_items)}\n")
+            append(f"• Overstocked Items: {len(high_items)}\n")
+            append(f"• Optimally Stocked: {optimal_count}\n")
             
-            return report
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ Error calculating optimal stock levels: {str(e)}"
@@ -499,33 +819,32 @@ class StockCalculatorAgent(BaseAgent):
     def _generate_financial_report(self) -> str:
         """Generate comprehensive financial report."""
         try:
-            result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="list_all"))
+            result = self._list_all_products()
             
             if not result.success:
                 return f"❌ Could not retrieve inventory data: {result.error}"
             
             products = result.result
+            table = self._product_table(products)
+            qty, price, value = table.qty, table.price, table.value
+            codes, categories = table.group_by_category()
+            
+            # Per-product projected sales and cost of goods in one pass over the columns
+            sales_value = self._estimate_daily_demand_array(price, codes, categories) * 365 * price
+            # Assume 60% gross margin
+            cogs = sales_value * 0.4
             
             # Calculate financial metrics
-            total_inventory_value = sum(p["quantity"] * p["price"] for p in products)
-            total_units = sum(p["quantity"] for p in products)
+            total_inventory_value = _ordered_sum(value)
+            total_units = int(qty.sum())
             
             # Carrying costs
             annual_carrying_cost = total_inventory_value * self.carrying_cost_rate
             monthly_carrying_cost = annual_carrying_cost / 12
             
             # Estimate annual sales and profit (simplified)
-            estimated_annual_sales = 0
-            estimated_cogs = 0
-            
-            for product in products:
-                annual_demand = self._estimate_annual_demand(product)
-                sales_value = annual_demand * product["price"]
-                # Assume 60% gross margin
-                cogs = sales_value * 0.4
-                
-                estimated_annual_sales += sales_value
-                estimated_cogs += cogs
+            estimated_annual_sales = _ordered_sum(sales_value)
+            estimated_cogs = _ordered_sum(cogs)
             
             gross_profit = estimated_annual_sales - estimated_cogs
             net_profit = gross_profit - annual_carrying_cost
@@ -534,85 +853,80 @@ class StockCalculatorAgent(BaseAgent):
             inventory_turnover = estimated_cogs / total_inventory_value if total_inventory_value > 0 else 0
             
             # Category financial breakdown
-            category_financials = {}
-            for product in products:
-                category = product["category"]
-                if category not in category_financials:
-                    category_financials[category] = {
-                        "inventory_value": 0,
-                        "estimated_sales": 0,
-                        "units": 0,
-                        "products": 0
-                    }
-                
-                annual_demand = self._estimate_annual_demand(product)
-                category_financials[category]["inventory_value"] += product["quantity"] * product["price"]
-                category_financials[category]["estimated_sales"] += annual_demand * product["price"]
-                category_financials[category]["units"] += product["quantity"]
-                category_financials[category]["products"] += 1
+            category_financials = _category_totals(codes, categories, qty, value, estimated_sales=sales_value)
             
             # Generate report
-            report = f"""💰 **FINANCIAL INVENTORY REPORT**
-═══════════════════════════════════════
+            parts = [_FINANCIAL_HEADER.format_map({
+                **self._parameter_fields(),
+                "total_inventory_value": total_inventory_value,
+                "total_units": total_units,
+                "value_per_unit": total_inventory_value / total_units,
+                "products": len(products),
+                "annual_carrying_cost": annual_carrying_cost,
+                "monthly_carrying_cost": monthly_carrying_cost,
+                "daily_carrying_cost": annual_carrying_cost / 365,
+                "estimated_annual_sales": estimated_annual_sales,
+                "estimated_cogs": estimated_cogs,
+                "gross_profit": gross_profit,
+                "net_profit": net_profit,
+                "inventory_turnover": inventory_turnover
+            })]
+            append = parts.append
 
-📊 **INVENTORY INVESTMENT:**
-• Total Inventory Value: ${total_inventory_value:,.2f}
-• Total Units in Stock: {total_units:,}
-• Average Value per Unit: ${total_inventory_value/total_units:.2f}
-• Number of SKUs: {len(products)}
-
-💸 **CARRYING COSTS:**
-• Annual Carrying Cost ({self.carrying_cost_rate*100:.0f}%): ${annual_carrying_cost:,.2f}
-• Monthly Carrying Cost: ${monthly_carrying_cost:,.2f}
-• Daily Carrying Cost: ${annual_carrying_cost/365:.2f}
-
-📈 **PROJECTED PERFORMANCE:**
-• Estimated Annual Sales: ${estimated_annual_sales:,.2f}
-• Estimated COGS: ${estimated_cogs:,.2f}
-• Gross Profit: ${gross_profit:,.2f}
-• Net Profit (after carrying costs): ${net_profit:,.2f}
-• Inventory Turnover Ratio: {inventory_turnover:.2f}x per year
-
-📂 **FINANCIAL BREAKDOWN BY CATEGORY:**"""
-
-            for category, data in sorted(category_financials.items(), key=lambda x: x[1]["inventory_value"], reverse=True):
-                inv_percentage = (data["inventory_value"] / total_inventory_value * 100) if total_inventory_value > 0 else 0
-                sales_percentage = (data["estimated_sales"] / estimated_annual_sales * 100) if estimated_annual_sales > 0 else 0
-                roi = (data["estimated_sales"] / data["inventory_value"] * 100) if data["inventory_value"] > 0 else 0
+            for category, products_count, units, inventory_value, estimated_sales in category_financials.itertuples(name=None):
+                inv_percentage = (inventory_value / total_inventory_value * 100) if total_inventory_value > 0 else 0
+                sales_percentage = (estimated_sales / estimated_annual_sales * 100) if estimated_annual_sales > 0 else 0
+                roi = (estimated_sales / inventory_value * 100) if inventory_value > 0 else 0
                 
-                report += f"\n\n• **{category}**:"
-                report += f"\n  └─ Inventory Value: ${data['inventory_value']:,.2f} ({inv_percentage:.1f}%)"
-                report += f"\n  └─ Projected Sales: ${data['estimated_sales']:,.2f} ({sales_percentage:.1f}%)"
-                report += f"\n  └─ ROI: {roi:.1f}%"
-                report += f"\n  └─ {data['products']} products, {data['units']:,} units"
+                append(f"\n\n• **{category}**:")
+                append(f"\n  └─ Inventory Value: ${inventory_value:,.2f} ({inv_percentage:.1f}%)")
+                append(f"\n  └─ Projected Sales: ${estimated_sales:,.2f} ({sales_percentage:.1f}%)")
+                append(f"\n  └─ ROI: {roi:.1f}%")
+                append(f"\n  └─ {products_count} products, {units:,} units")
             
             # Key performance indicators
-            report += f"\n\n📊 **KEY PERFORMANCE INDICATORS:**"
-            report += f"\n• Inventory-to-Sales Ratio: {(total_inventory_value/estimated_annual_sales)*100:.1f}%"
-            report += f"\n• Days Sales in Inventory: {365/inventory_turnover:.0f} days"
-            report += f"\n• Gross Margin: {(gross_profit/estimated_annual_sales)*100:.1f}%"
-            report += f"\n• Net Margin: {(net_profit/estimated_annual_sales)*100:.1f}%"
+            append(f"\n\n📊 **KEY PERFORMANCE INDICATORS:**")
+            append(f"\n• Inventory-to-Sales Ratio: {(total_inventory_value/estimated_annual_sales)*100:.1f}%")
+            append(f"\n• Days Sales in Inventory: {365/inventory_turnover:.0f} days")
+            append(f"\n• Gross Margin: {(gross_profit/estimated_annual_sales)*100:.1f}%")
+            append(f"\n• Net Margin: {(net_profit/estimated_annual_sales)*100:.1f}%")
             
             # Recommendations
-            report += f"\n\n💡 **FINANCIAL RECOMMENDATIONS:**"
+            append(f"\n\n💡 **FINANCIAL RECOMMENDATIONS:**")
             
             if inventory_turnover < 4:
-                report += f"\n• ⚠️ Low inventory turnover - consider reducing slow-moving stock"
+                append(f"\n• ⚠️ Low inventory turnover - consider reducing slow-moving stock")
             else:
-                report += f"\n• ✅ Healthy inventory turnover rate"
+                append(f"\n• ✅ Healthy inventory turnover rate")
             
             if (total_inventory_value/estimated_annual_sales) > 0.25:
-                report += f"\n• ⚠️ High inventory-to-sales ratio - optimize stock levels"
+                append(f"\n• ⚠️ High inventory-to-sales ratio - optimize stock levels")
             else:
-                report += f"\n• ✅ Reasonable inventory-to-sales ratio"
+                append(f"\n• ✅ Reasonable inventory-to-sales ratio")
             
-            report += f"\n• 💰 Potential annual savings from optimization: ${annual_carrying_cost*0.2:,.2f}"
+            append(f"\n• 💰 Potential annual savings from optimization: ${annual_carrying_cost*0.2:,.2f}")
             
-            return report
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ Error generating financial report: {str(e)}"
     
+    def _generate_combined_report(self) -> str:
+        """Run every inventory-wide report concurrently and join them into one dashboard."""
+        # Fetch the snapshot once up front so the reports share it instead of racing to fill the cache
+        self._list_all_products()
+        
+        reports = (
+            self._calculate_reorder_points,
+            self._calculate_inventory_values,
+            self._analyze_inventory_turnover,
+            self._calculate_optimal_stock_levels,
+            self._generate_financial_report
+        )
+        with ThreadPoolExecutor(max_workers=len(reports)) as executor:
+            futures = [executor.submit(report) for report in reports]
+            return "\n".join(future.result() for future in futures)
+    
     def _calculate_product_metrics(self, product_id: str) -> str:
         """Calculate detailed metrics for a specific product."""
         if not product_id:
@@ -626,6 +940,12 @@ class StockCalculatorAgent(BaseAgent):
             
             product = result.result
             
+            key = ("product", product_id)
+            signature = self._product_signature(product)
+            cached = self._cached_report(key, signature)
+            if cached:
+                return cached
+            
             # Calculate various metrics
             daily_demand = self._estimate_daily_demand(product)
             annual_demand = daily_demand * 365
@@ -645,53 +965,44 @@ class StockCalculatorAgent(BaseAgent):
             # Carrying cost
             annual_carrying_cost = current_value * self.carrying_cost_rate
             
-            report = f"""🔢 **PRODUCT CALCULATIONS: {product['product_name']}**
-═══════════════════════════════════════
-
-📦 **BASIC INFORMATION:**
-• Product ID: {product['product_id']}
-• Category: {product['category']}
-• Unit Price: ${product['price']:.2f}
-• Current Stock: {product['quantity']} units
-
-💰 **FINANCIAL METRICS:**
-• Current Inventory Value: ${current_value:,.2f}
-• Estimated Annual Sales: ${annual_sales_value:,.2f}
-• Annual Carrying Cost: ${annual_carrying_cost:.2f}
-• Value per Unit: ${product['price']:.2f}
-
-📊 **DEMAND & TURNOVER:**
-• Estimated Daily Demand: {daily_demand:.2f} units
-• Estimated Annual Demand: {annual_demand:.0f} units
-• Inventory Turnover: {turnover_ratio:.2f}x per year
-• Days of Supply: {days_of_supply:.0f} days
-
-⚙️ **OPTIMIZATION METRICS:**
-• Economic Order Quantity (EOQ): {eoq:.0f} units
-• Reorder Point: {reorder_point:.0f} units
-• Safety Stock: {daily_demand * self.safety_stock_days:.0f} units
-• Lead Time Demand: {daily_demand * self.lead_time_days:.0f} units
-
-🎯 **RECOMMENDATIONS:**"""
+            parts = [_PRODUCT_HEADER.format_map({
+                "product_name": product["product_name"],
+                "product_id": product["product_id"],
+                "category": product["category"],
+                "price": product["price"],
+                "quantity": product["quantity"],
+                "current_value": current_value,
+                "annual_sales_value": annual_sales_value,
+                "annual_carrying_cost": annual_carrying_cost,
+                "daily_demand": daily_demand,
+                "annual_demand": annual_demand,
+                "turnover_ratio": turnover_ratio,
+                "days_of_supply": days_of_supply,
+                "eoq": eoq,
+                "reorder_point": reorder_point,
+                "safety_stock": daily_demand * self.safety_stock_days,
+                "lead_time_demand": daily_demand * self.lead_time_days
+            })]
+            append = parts.append
 
             # Generate recommendations
             if product["quantity"] == 0:
-                report += f"\n• 🚨 URGENT: Product is out of stock - order {eoq:.0f} units immediately"
+                append(f"\n• 🚨 URGENT: Product is out of stock - order {eoq:.0f} units immediately")
             elif product["quantity"] < reorder_point:
                 shortage = reorder_point - product["quantity"]
-                report += f"\n• ⚠️ Below reorder point by {shortage:.0f} units - order {eoq:.0f} units"
+                append(f"\n• ⚠️ Below reorder point by {shortage:.0f} units - order {eoq:.0f} units")
             elif turnover_ratio < 2:
-                report += f"\n• 🐌 Slow-moving item - consider reducing stock or promotional pricing"
+                append(f"\n• 🐌 Slow-moving item - consider reducing stock or promotional pricing")
             elif turnover_ratio > 12:
-                report += f"\n• 🚀 Fast-moving item - consider increasing stock levels"
+                append(f"\n• 🚀 Fast-moving item - consider increasing stock levels")
             else:
-                report += f"\n• ✅ Stock levels appear optimal for current demand"
+                append(f"\n• ✅ Stock levels appear optimal for current demand")
             
             # Cost analysis
             if annual_carrying_cost > annual_sales_value * 0.1:
-                report += f"\n• 💸 High carrying cost relative to sales - optimize stock levels"
+                append(f"\n• 💸 High carrying cost relative to sales - optimize stock levels")
             
-            return report
+            return self._store_report(key, signature, "".join(parts))
             
         except Exception as e:
             return f"❌ Error calculating product metrics: {str(e)}"
@@ -699,33 +1010,36 @@ class StockCalculatorAgent(BaseAgent):
     def _calculate_category_metrics(self, category: str) -> str:
         """Calculate metrics for a specific category."""
         try:
-            result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="search", category=category))
+            # Filter the shared snapshot the same way the sheet's category search does
+            result = self._list_all_products()
             
             if not result.success:
                 return f"❌ Could not search category: {result.error}"
             
-            products = result.result
+            key = ("category", category)
+            signature = self._snapshot_signature(result)
+            cached = self._cached_report(key, signature)
+            if cached:
+                return cached
+            
+            category_lower = category.lower()
+            products = [p for p in result.result if category_lower in p["category"].lower()]
             
             if not products:
                 return f"❌ No products found in category '{category}'"
             
+            table = self._product_table(products)
+            
             # Calculate category totals
             total_products = len(products)
-            total_units = sum(p["quantity"] for p in products)
-            total_value = sum(p["quantity"] * p["price"] for p in products)
-            avg_price = sum(p["price"] for p in products) / total_products
-            
-            # Calculate aggregate metrics
-            total_annual_demand = 0
-            total_eoq_investment = 0
-            
-            for product in products:
-                daily_demand = self._estimate_daily_demand(product)
-                annual_demand = daily_demand * 365
-                eoq = self._calculate_eoq(product, annual_demand)
-                
-                total_annual_demand += annual_demand
-                total_eoq_investment += eoq * product["price"]
+            total_units = int(table.qty.sum())
+            total_value = _ordered_sum(table.value)
+            avg_price = _ordered_sum(table.price) / total_products
+            
+            # Calculate aggregate metrics with one batch EOQ pass over the category
+            levels = self._stock_levels(table)
+            total_annual_demand = _ordered_sum(levels.daily_demand * 365)
+            total_eoq_investment = _ordered_sum(levels.eoq * levels.price)
             
             # Turnover analysis
             category_turnover = total_annual_demand / total_units if total_units > 0 else 0
@@ -733,22 +1047,18 @@ class StockCalculatorAgent(BaseAgent):
             # Carrying costs
             annual_carrying_cost = total_value * self.carrying_cost_rate
             
-            report = f"""📂 **CATEGORY CALCULATIONS: {category.upper()}**
-═══════════════════════════════════════
-
-📊 **CATEGORY OVERVIEW:**
-• Total Products: {total_products}
-• Total Units: {total_units:,}
-• Total Value: ${total_value:,.2f}
-• Average Price: ${avg_price:.2f}
-
-💰 **FINANCIAL METRICS:**
-• Annual Carrying Cost: ${annual_carrying_cost:,.2f}
-• Estimated Annual Demand: {total_annual_demand:.0f} units
-• Category Turnover: {category_turnover:.2f}x per year
-• Optimal Reorder Investment: ${total_eoq_investment:,.2f}
-
-📈 **PERFORMANCE ANALYSIS:**"""
+            parts = [_CATEGORY_HEADER.format_map({
+                "category": category.upper(),
+                "total_products": total_products,
+                "total_units": total_units,
+                "total_value": total_value,
+                "avg_price": avg_price,
+                "annual_carrying_cost": annual_carrying_cost,
+                "total_annual_demand": total_annual_demand,
+                "category_turnover": category_turnover,
+                "total_eoq_investment": total_eoq_investment
+            })]
+            append = parts.append
 
             # Performance classification
             if category_turnover >= 6:
@@ -764,30 +1074,29 @@ class StockCalculatorAgent(BaseAgent):
                 performance = "Poor Performance"
                 emoji = "🐌"
             
-            report += f"\n• {emoji} **{performance}** (Turnover: {category_turnover:.2f}x)"
+            append(f"\n• {emoji} **{performance}** (Turnover: {category_turnover:.2f}x)")
             
             # Top performers in category
-            products_by_value = sorted(products, key=lambda x: x["quantity"] * x["price"], reverse=True)
-            
-            report += f"\n\n🏆 **TOP PRODUCTS BY VALUE:**"
-            for i, product in enumerate(products_by_value[:3], 1):
-                value = product["quantity"] * product["price"]
+            append(f"\n\n🏆 **TOP PRODUCTS BY VALUE:**")
+            for i, index in enumerate(_top_indices(table.value, 3).tolist(), 1):
+                product = products[index]
+                value = table.value.item(index)
                 percentage = (value / total_value * 100) if total_value > 0 else 0
-                report += f"\n{i}. {product['product_name']}: ${value:,.2f} ({percentage:.1f}%)"
+                append(f"\n{i}. {product['product_name']}: ${value:,.2f} ({percentage:.1f}%)")
             
             # Recommendations
-            report += f"\n\n💡 **CATEGORY RECOMMENDATIONS:**"
+            append(f"\n\n💡 **CATEGORY RECOMMENDATIONS:**")
             
             if category_turnover < 2:
-                report += f"\n• Consider reducing inventory levels for slow-moving items"
-                report += f"\n• Implement promotional strategies to increase sales velocity"
+                append(f"\n• Consider reducing inventory levels for slow-moving items")
+                append(f"\n• Implement promotional strategies to increase sales velocity")
             elif category_turnover > 8:
-                report += f"\n• Consider increasing stock levels to avoid stockouts"
-                report += f"\n• Monitor for supply chain constraints"
+                append(f"\n• Consider increasing stock levels to avoid stockouts")
+                append(f"\n• Monitor for supply chain constraints")
             
-            report += f"\n• Potential annual savings: ${annual_carrying_cost * 0.15:,.2f}"
+            append(f"\n• Potential annual savings: ${annual_carrying_cost * 0.15:,.2f}")
             
-            return report
+            return self._store_report(key, signature, "".join(parts))
             
         except Exception as e:
             return f"❌ Error calculating category metrics: {str(e)}"
@@ -795,164 +1104,101 @@ class StockCalculatorAgent(BaseAgent):
     def _perform_abc_analysis(self) -> str:
         """Perform ABC analysis on inventory."""
         try:
-            result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="list_all"))
+            result = self._list_all_products()
             
             if not result.success:
                 return f"❌ Could not retrieve inventory data: {result.error}"
             
-            products = result.result
+            key = ("abc",)
+            signature = self._snapshot_signature(result)
+            cached = self._cached_report(key, signature)
+            if cached:
+                return cached
             
-            # Calculate annual value for each product
-            product_values = []
-            for product in products:
-                annual_demand = self._estimate_annual_demand(product)
-                annual_value = annual_demand * product["price"]
-                product_values.append({
-                    "product": product,
-                    "annual_value": annual_value,
-                    "current_value": product["quantity"] * product["price"]
-                })
-            
-            # Sort by annual value (descending)
-            product_values.sort(key=lambda x: x["annual_value"], reverse=True)
-            
-            # Calculate cumulative percentages
-            total_annual_value = sum(pv["annual_value"] for pv in product_values)
-            cumulative_value = 0
-            
-            for pv in product_values:
-                cumulative_value += pv["annual_value"]
-                pv["cumulative_percentage"] = (cumulative_value / total_annual_value * 100) if total_annual_value > 0 else 0
-            
-            # Classify into ABC categories
-            a_items = []
-            b_items = []
-            c_items = []
-            
-            for pv in product_values:
-                if pv["cumulative_percentage"] <= 80:
-                    pv["category"] = "A"
-                    a_items.append(pv)
-                elif pv["cumulative_percentage"] <= 95:
-                    pv["category"] = "B"
-                    b_items.append(pv)
-                else:
-                    pv["category"] = "C"
-                    c_items.append(pv)
-            
-            # Calculate category statistics
-            def calc_category_stats(items):
-                if not items:
-                    return {"count": 0, "annual_value": 0, "current_value": 0, "percentage": 0}
-                
-                return {
-                    "count": len(items),
-                    "annual_value": sum(item["annual_value"] for item in items),
-                    "current_value": sum(item["current_value"] for item in items),
-                    "percentage": len(items) / len(products) * 100 if products else 0
-                }
+            products = result.result
             
-            a_stats = calc_category_stats(a_items)
-            b_stats = calc_category_stats(b_items)
-            c_stats = calc_category_stats(c_items)
+            table = self._product_table(products)
+            
+            # Annual value for each product, classified A (first 80% of value), B (next 15%) or C
+            annual_value = self._estimate_daily_demand_array(table.price, *table.group_by_category()) * 365 * table.price
+            ranked, abc_class = _abc_classes(annual_value)
+            
+            # Calculate category statistics in one binned pass over the ranked products followed by
+            # the unranked class C remainder, so classes A and B accumulate in value order
+            unranked = np.ones(len(products), dtype=bool)
+            unranked[ranked] = False
+            sequence = np.concatenate((ranked, np.flatnonzero(unranked)))
+            sequence_class = abc_class[sequence]
+            counts = np.bincount(sequence_class, minlength=3).tolist()
+            annual_by_class = np.bincount(sequence_class, weights=annual_value[sequence], minlength=3).tolist()
+            current_by_class = np.bincount(sequence_class, weights=table.value[sequence], minlength=3).tolist()
+            
+            a_stats, b_stats, c_stats = (
+                {
+                    "count": counts[i],
+                    "annual_value": annual_by_class[i],
+                    "current_value": current_by_class[i],
+                    "percentage": counts[i] / len(products) * 100
+                } if counts[i] else {"count": 0, "annual_value": 0, "current_value": 0, "percentage": 0}
+                for i in range(3)
+            )
+            a_items = ranked[abc_class[ranked] == 0]
             
             # Generate report
-            report = f"""📊 **ABC INVENTORY ANALYSIS**
-═══════════════════════════════════════
-
-🎯 **ABC CLASSIFICATION RESULTS:**
+            parts = [_ABC_HEADER.format_map({"a": a_stats, "b": b_stats, "c": c_stats})]
+            append = parts.append
 
-🅰️ **CLASS A - HIGH VALUE (Top 80% of value)**
-• Products: {a_stats['count']} ({a_stats['percentage']:.1f}% of items)
-• Annual Value: ${a_stats['annual_value']:,.2f}
-• Current Inventory: ${a_stats['current_value']:,.2f}
-• Management Focus: Tight control, frequent review
-
-🅱️ **CLASS B - MEDIUM VALUE (Next 15% of value)**
-• Products: {b_stats['count']} ({b_stats['percentage']:.1f}% of items)
-• Annual Value: ${b_stats['annual_value']:,.2f}
-• Current Inventory: ${b_stats['current_value']:,.2f}
-• Management Focus: Moderate control, periodic review
-
-🅲️ **CLASS C - LOW VALUE (Remaining 5% of value)**
-• Products: {c_stats['count']} ({c_stats['percentage']:.1f}% of items)
-• Annual Value: ${c_stats['annual_value']:,.2f}
-• Current Inventory: ${c_stats['current_value']:,.2f}
-• Management Focus: Simple controls, annual review
-
-📋 **TOP CLASS A ITEMS:**"""
-
-            for i, item in enumerate(a_items[:5], 1):
-                product = item["product"]
-                report += f"\n{i}. **{product['product_name']}** ({product['product_id']})"
-                report += f"\n   └─ Annual Value: ${item['annual_value']:,.2f} | Current Stock: ${item['current_value']:,.2f}"
+            for i, index in enumerate(a_items[:5].tolist(), 1):
+                product = products[index]
+                append(
+                    f"\n{i}. **{product['product_name']}** ({product['product_id']})"
+                    f"\n   └─ Annual Value: ${annual_value[index]:,.2f} | Current Stock: ${table.value[index]:,.2f}"
+                )
             
             if len(a_items) > 5:
-                report += f"\n   ... and {len(a_items) - 5} more Class A items"
-            
-            report += f"\n\n💡 **MANAGEMENT RECOMMENDATIONS:**"
-            report += f"\n\n🅰️ **Class A Items ({a_stats['count']} products):**"
-            report += f"\n• Implement daily monitoring and tight inventory controls"
-            report += f"\n• Use sophisticated forecasting methods"
-            report += f"\n• Negotiate better supplier terms due to high volume"
-            report += f"\n• Consider vendor-managed inventory for top items"
-            
-            report += f"\n\n🅱️ **Class B Items ({b_stats['count']} products):**"
-            report += f"\n• Weekly monitoring and moderate controls"
-            report += f"\n• Standard forecasting and reorder procedures"
-            report += f"\n• Quarterly supplier reviews"
-            
-            report += f"\n\n🅲️ **Class C Items ({c_stats['count']} products):**"
-            report += f"\n• Monthly monitoring with simple controls"
-            report += f"\n• Consider bulk purchasing to reduce ordering costs"
-            report += f"\n• Annual supplier reviews"
-            report += f"\n• Evaluate discontinuation of very slow movers"
+                append(f"\n   ... and {len(a_items) - 5} more Class A items")
+            
+            append(f"\n\n💡 **MANAGEMENT RECOMMENDATIONS:**")
+            append(f"\n\n🅰️ **Class A Items ({a_stats['count']} products):**")
+            append(f"\n• Implement daily monitoring and tight inventory controls")
+            append(f"\n• Use sophisticated forecasting methods")
+            append(f"\n• Negotiate better supplier terms due to high volume")
+            append(f"\n• Consider vendor-managed inventory for top items")
+            
+            append(f"\n\n🅱️ **Class B Items ({b_stats['count']} products):**")
+            append(f"\n• Weekly monitoring and moderate controls")
+            append(f"\n• Standard forecasting and reorder procedures")
+            append(f"\n• Quarterly supplier reviews")
+            
+            append(f"\n\n🅲️ **Class C Items ({c_stats['count']} products):**")
+            append(f"\n• Monthly monitoring with simple controls")
+            append(f"\n• Consider bulk purchasing to reduce ordering costs")
+            append(f"\n• Annual supplier reviews")
+            append(f"\n• Evaluate discontinuation of very slow movers")
             
             # Investment analysis
-            total_current_value = sum(pv["current_value"] for pv in product_values)
+            total_current_value = _ordered_sum(table.value)
             
-            report += f"\n\n💰 **INVESTMENT DISTRIBUTION:**"
-            report += f"\n• Total Current Inventory: ${total_current_value:,.2f}"
-            report += f"\n• Class A Investment: ${a_stats['current_value']:,.2f} ({a_stats['current_value']/total_current_value*100:.1f}%)"
-            report += f"\n• Class B Investment: ${b_stats['current_value']:,.2f} ({b_stats['current_value']/total_current_value*100:.1f}%)"
-            report += f"\n• Class C Investment: ${c_stats['current_value']:,.2f} ({c_stats['current_value']/total_current_value*100:.1f}%)"
+            append(f"\n\n💰 **INVESTMENT DISTRIBUTION:**")
+            append(f"\n• Total Current Inventory: ${total_current_value:,.2f}")
+            append(f"\n• Class A Investment: ${a_stats['current_value']:,.2f} ({a_stats['current_value']/total_current_value*100:.1f}%)")
+            append(f"\n• Class B Investment: ${b_stats['current_value']:,.2f} ({b_stats['current_value']/total_current_value*100:.1f}%)")
+            append(f"\n• Class C Investment: ${c_stats['current_value']:,.2f} ({c_stats['current_value']/total_current_value*100:.1f}%)")
             
-            return report
+            return self._store_report(key, signature, "".join(parts))
             
         except Exception as e:
             return f"❌ Error performing ABC analysis: {str(e)}"
     
     def _estimate_daily_demand(self, product: Dict[str, Any]) -> float:
         """Estimate daily demand based on product characteristics."""
-        # Simplified demand estimation - in practice, use historical sales data
-        price = product["price"]
-        category = product["category"].lower()
-        
-        # Base demand by category
-        if "electronics" in category:
-            base_demand = 2.0
-        elif "audio" in category:
-            base_demand = 1.5
-        elif "accessories" in category:
-            base_demand = 3.0
-        else:
-            base_demand = 1.0
-        
-        # Adjust by price (higher price = lower demand)
-        if price > 1000:
-            price_factor = 0.3
-        elif price > 500:
-            price_factor = 0.5
-        elif price > 100:
-            price_factor = 0.8
-        else:
-            price_factor = 1.2
-        
-        return base_demand * price_factor
+        return _daily_demand(product["price"], product["category"])
     
-    def _estimate_annual_demand(self, product: Dict[str, Any]) -> float:
-        """Estimate annual demand."""
-        return self._estimate_daily_demand(product) * 365
+    def _estimate_daily_demand_array(self, price: np.ndarray, codes: np.ndarray, categories: np.ndarray) -> np.ndarray:
+        """Vectorized _estimate_daily_demand() over price and factorized category columns."""
+        base_demand = np.array([_category_base_demand(category) for category in categories], dtype=np.float64)
+        price_factor = _PRICE_FACTORS[np.searchsorted(_PRICE_BREAKS, price)]
+        return base_demand[codes] * price_factor
     
     def _calculate_eoq(self, product: Dict[str, Any], annual_demand: float) -> float:
         """Calculate Economic Order Quantity."""
@@ -976,43 +1222,14 @@ class StockCalculatorAgent(BaseAgent):
     
     def _extract_product_id(self, message: str) -> str:
         """Extract product ID from message."""
-        import re
-        pattern = r'\b[A-Z]+\d+\b'
-        matches = re.findall(pattern, message.upper())
-        return matches[0] if matches else ""
+        match = _PRODUCT_ID_RE.search(message)
+        return match.group(0).upper() if match else ""
     
     def _extract_category(self, message: str) -> str:
         """Extract category from message."""
         message_lower = message.lower()
-        categories = ["electronics", "audio", "accessories"]
-        
-        for category in categories:
-            if category in message_lower:
-                return category.title()
-        
-        return ""
+        return next((title for category, title in _MESSAGE_CATEGORIES if category in message_lower), "")
     
     def _handle_general_calculation_query(self, message: str) -> str:
         """Handle general calculation queries."""
-        return f"""🧮 **Stock Calculator Agent Ready!**
-
-I can perform these calculations:
-
-📊 **Inventory Calculations:**
-• "Calculate reorder points" - When to reorder each product
-• "Calculate inventory values" - Total values and breakdowns
-• "Analyze inventory turnover" - How fast products move
-• "Calculate optimal stock levels" - Min/max recommendations
-
-💰 **Financial Analysis:**
-• "Generate financial report" - Comprehensive financial metrics
-• "Perform ABC analysis" - Classify products by value importance
-
-🔍 **Product-Specific:**
-• "Calculate metrics for LAPTOP001" - Detailed product analysis
-• "Calculate Electronics category" - Category-wide metrics
-
-📈 **What calculations would you like me to perform?**
-
-Your message: "{message}"
-"""
\ No newline at end of file
+        return f'{_CALCULATION_HELP}Your message: "{message}"\n'
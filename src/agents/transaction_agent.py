@@ -2,11 +2,67 @@
 Transaction Agent - Specialized agent for sales, purchases, and inventory transactions.
 """
 
-from typing import Dict, Any, List
+import heapq
+import re
+import time
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Any, Iterator, List, Optional
 from src.agents.base_agent import BaseAgent
+from src.tools.base_tool import ToolOutput
 from src.tools.transaction_tool import TransactionTool, TransactionInput
 
 
+# Seconds a fetched transaction list is reused across reports
+_TRANSACTIONS_CACHE_TTL = 30
+
+# The list request carries no per-call fields, so one validated instance is reused
+_LIST_TRANSACTIONS_INPUT = TransactionInput(action="list_transactions")
+
+# Report icon per transaction type; other types use _DEFAULT_TYPE_EMOJI
+_TYPE_EMOJI = {"sale": "💰", "purchase": "📦", "adjustment": "⚙️"}
+_DEFAULT_TYPE_EMOJI = "📄"
+
+
+# Keyword groups for _classify_transaction_request(). The lookahead makes finditer test
+# every position, so each group is reported even when keywords overlap.
+_TRANSACTION_KEYWORDS_RE = re.compile(
+    r"(?=(?P<sale>sell|sale|sold|customer bought)"
+    r"|(?P<purchase>buy|purchase|restock|order|supplier)"
+    r"|(?P<adjustment>adjust|correction|fix stock|inventory adjustment)"
+    r"|(?P<transaction_history>transaction history|recent transactions|transaction list)"
+    r"|(?P<product_history>product history|movement history|track product)"
+    r"|(?P<daily_summary>daily summary|today sales|daily report)"
+    r"|(?P<sales_report>sales report|sales analytics|revenue))"
+)
+
+# Operations in priority order when a message matches several
+_TRANSACTION_OPERATIONS = (
+    "sale", "purchase", "adjustment", "transaction_history", "product_history", "daily_summary", "sales_report"
+)
+
+# Transaction details in messages such as "sell 2 LAPTOP001 for $1299.99 to John Doe"
+_PRODUCT_ID_RE = re.compile(r'\b[A-Za-z]+\d+\b')
+_QUANTITY_RE = re.compile(r'\b(\d+)\s*(?:units?|pieces?|items?)?\b')
+_PRICE_RE = re.compile(r'\$?(\d+(?:\.\d{2})?)')
+_CUSTOMER_RE = re.compile(r'(?:to|customer|buyer)\s+([A-Za-z\s]+)', re.IGNORECASE)
+
+# Signed quantity change for stock adjustments
+_ADJUSTMENT_RE = re.compile(r'([+-]?\d+)')
+
+
+@lru_cache(maxsize=256)
+def _classify_transaction_message(message_lower: str) -> str:
+    """Operation for a lower-cased message; the report buttons resend the same few messages."""
+    # Every keyword group present anywhere in the message
+    found = {match.lastgroup for match in _TRANSACTION_KEYWORDS_RE.finditer(message_lower)}
+    
+    for operation in _TRANSACTION_OPERATIONS:
+        if operation in found:
+            return operation
+    return "general"
+
+
 class TransactionAgent(BaseAgent):
     """
     Specialized agent for transaction management.
@@ -29,6 +85,10 @@ class TransactionAgent(BaseAgent):
             description="Specialized agent for sales, purchases, and inventory transaction management",
             tools=[self.transaction_tool]
         )
+        
+        # (transaction write version, fetch time, list_transactions result) reused by the
+        # history and sales reports
+        self._transactions_cache = None
     
     def process_message(self, message: str) -> str:
         """Process transaction-related messages."""
@@ -38,20 +98,9 @@ class TransactionAgent(BaseAgent):
             # Determine what transaction operation to perform
             operation = self._classify_transaction_request(message)
             
-            if operation == "sale":
-                response = self._handle_sale_request(message)
-            elif operation == "purchase":
-                response = self._handle_purchase_request(message)
-            elif operation == "adjustment":
-                response = self._handle_adjustment_request(message)
-            elif operation == "transaction_history":
-                response = self._show_transaction_history(message)
-            elif operation == "product_history":
-                response = self._show_product_history(message)
-            elif operation == "daily_summary":
-                response = self._generate_daily_summary()
-            elif operation == "sales_report":
-                response = self._generate_sales_report()
+            handler = self._OPERATION_HANDLERS.get(operation)
+            if handler is not None:
+                response = handler(self, message)
             else:
                 response = self._handle_general_transaction_query(message)
                 
@@ -61,26 +110,31 @@ class TransactionAgent(BaseAgent):
         self.conversation_history.append({"role": "assistant", "content": response})
         return response
     
+    def _list_transactions(self) -> ToolOutput:
+        """
+        List transactions, reusing a result fetched within the last _TRANSACTIONS_CACHE_TTL
+        seconds while no transaction has been recorded since, by this agent or any other.
+        """
+        # Read before the fetch, so a record made during it leaves the result stale
+        version = self.transaction_tool.write_version()
+        now = time.monotonic()
+        cache = self._transactions_cache
+        if cache is not None and cache[0] == version and now - cache[1] < _TRANSACTIONS_CACHE_TTL:
+            return cache[2]
+        
+        result = self.transaction_tool.execute(_LIST_TRANSACTIONS_INPUT)
+        if result.success:
+            self._transactions_cache = (version, now, result)
+        return result
+    
     def _classify_transaction_request(self, message: str) -> str:
         """Classify the type of transaction request."""
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ['sell', 'sale', 'sold', 'customer bought']):
-            return "sale"
-        elif any(word in message_lower for word in ['buy', 'purchase', 'restock', 'order', 'supplier']):
-            return "purchase"
-        elif any(word in message_lower for word in ['adjust', 'correction', 'fix stock', 'inventory adjustment']):
-            return "adjustment"
-        elif any(word in message_lower for word in ['transaction history', 'recent transactions', 'transaction list']):
-            return "transaction_history"
-        elif any(word in message_lower for word in ['product history', 'movement history', 'track product']):
-            return "product_history"
-        elif any(word in message_lower for word in ['daily summary', 'today sales', 'daily report']):
-            return "daily_summary"
-        elif any(word in message_lower for word in ['sales report', 'sales analytics', 'revenue']):
-            return "sales_report"
-        else:
-            return "general"
+        return _classify_transaction_message(message.lower())
+    
+    def _extract_product_id(self, message: str) -> Optional[str]:
+        """Extract product ID from message."""
+        product_match = _PRODUCT_ID_RE.search(message)
+        return product_match.group(0).upper() if product_match else None
     
     def _handle_sale_request(self, message: str) -> str:
         """Handle sale transaction requests."""
@@ -89,22 +143,20 @@ class TransactionAgent(BaseAgent):
         
         try:
             # Look for patterns like "sell 2 LAPTOP001 for $1299.99 to John Doe"
-            import re
             
             # Extract product ID
-            product_match = re.search(r'\b([A-Z]+\d+)\b', message.upper())
-            product_id = product_match.group(1) if product_match else None
+            product_id = self._extract_product_id(message)
             
             # Extract quantity
-            quantity_match = re.search(r'\b(\d+)\s*(?:units?|pieces?|items?)?\b', message)
+            quantity_match = _QUANTITY_RE.search(message)
             quantity = int(quantity_match.group(1)) if quantity_match else None
             
             # Extract price
-            price_match = re.search(r'\$?(\d+(?:\.\d{2})?)', message)
+            price_match = _PRICE_RE.search(message)
             unit_price = float(price_match.group(1)) if price_match else None
             
             # Extract customer info
-            customer_match = re.search(r'(?:to|customer|buyer)\s+([A-Za-z\s]+)', message, re.IGNORECASE)
+            customer_match = _CUSTOMER_RE.search(message)
             customer_info = customer_match.group(1).strip() if customer_match else None
             
             if not all([product_id, quantity, unit_price]):
@@ -161,16 +213,13 @@ To process a sale, I need:
     def _handle_purchase_request(self, message: str) -> str:
         """Handle purchase/restock requests."""
         try:
-            import re
-            
             # Extract details from message
-            product_match = re.search(r'\b([A-Z]+\d+)\b', message.upper())
-            product_id = product_match.group(1) if product_match else None
+            product_id = self._extract_product_id(message)
             
-            quantity_match = re.search(r'\b(\d+)\s*(?:units?|pieces?|items?)?\b', message)
+            quantity_match = _QUANTITY_RE.search(message)
             quantity = int(quantity_match.group(1)) if quantity_match else None
             
-            price_match = re.search(r'\$?(\d+(?:\.\d{2})?)', message)
+            price_match = _PRICE_RE.search(message)
             unit_price = float(price_match.group(1)) if price_match else None
             
             if not all([product_id, quantity, unit_price]):
@@ -223,14 +272,11 @@ To process a purchase, I need:
     def _handle_adjustment_request(self, message: str) -> str:
         """Handle stock adjustment requests."""
         try:
-            import re
-            
             # Extract details from message
-            product_match = re.search(r'\b([A-Z]+\d+)\b', message.upper())
-            product_id = product_match.group(1) if product_match else None
+            product_id = self._extract_product_id(message)
             
             # Look for adjustment amount (can be positive or negative)
-            adjustment_match = re.search(r'([+-]?\d+)', message)
+            adjustment_match = _ADJUSTMENT_RE.search(message)
             quantity_change = int(adjustment_match.group(1)) if adjustment_match else None
             
             if not all([product_id, quantity_change is not None]):
@@ -281,7 +327,7 @@ To process a stock adjustment, I need:
     def _show_transaction_history(self, message: str) -> str:
         """Show recent transaction history."""
         try:
-            result = self.transaction_tool.execute(TransactionInput(action="list_transactions"))
+            result = self._list_transactions()
             
             if result.success:
                 transactions = result.result
@@ -289,51 +335,49 @@ To process a stock adjustment, I need:
                 if not transactions:
                     return "📋 **No transactions found.**"
                 
-                report = f"📋 **RECENT TRANSACTIONS ({len(transactions)} total)**\n"
-                report += "═══════════════════════════════════════\n\n"
-                
-                for txn in transactions[:10]:  # Show last 10
-                    txn_type_emoji = {
-                        "sale": "💰",
-                        "purchase": "📦", 
-                        "adjustment": "⚙️"
-                    }.get(txn["transaction_type"], "📄")
-                    
-                    report += f"{txn_type_emoji} **{txn['transaction_id']}** - {txn['date']} {txn['time']}\n"
-                    report += f"   {txn['transaction_type'].title()}: {txn['product_name']} ({txn['product_id']})\n"
-                    report += f"   Quantity: {txn['quantity']:+d} units"
-                    
-                    if txn['transaction_type'] != 'adjustment':
-                        report += f" @ ${txn['unit_price']:.2f} = ${txn['total_amount']:.2f}"
-                    
-                    report += f"\n   Stock: {txn['previous_stock']} → {txn['new_stock']}\n"
-                    
-                    if txn['customer_info']:
-                        report += f"   Customer: {txn['customer_info']}\n"
-                    
-                    if txn['notes']:
-                        report += f"   Notes: {txn['notes']}\n"
-                    
-                    report += "\n"
-                
-                if len(transactions) > 10:
-                    report += f"... and {len(transactions) - 10} more transactions\n"
-                
-                return report
+                return "".join(self._iter_transaction_history(transactions))
             else:
                 return f"❌ Error retrieving transactions: {result.error}"
                 
         except Exception as e:
             return f"❌ Error showing transaction history: {str(e)}"
     
+    def _iter_transaction_history(self, transactions: List[Dict[str, Any]]) -> Iterator[str]:
+        """Yield the transaction history report piece by piece, showing the first 10 transactions."""
+        transaction_count = len(transactions)
+        yield f"📋 **RECENT TRANSACTIONS ({transaction_count} total)**\n"
+        yield "═══════════════════════════════════════\n\n"
+        
+        for txn in islice(transactions, 10):
+            txn_type = txn["transaction_type"]
+            customer_info = txn.get("customer_info")
+            notes = txn.get("notes")
+            
+            yield f"{_TYPE_EMOJI.get(txn_type, _DEFAULT_TYPE_EMOJI)} **{txn['transaction_id']}** - {txn['date']} {txn['time']}\n"
+            yield f"   {txn_type.title()}: {txn['product_name']} ({txn['product_id']})\n"
+            yield f"   Quantity: {txn['quantity']:+d} units"
+            
+            if txn_type != 'adjustment':
+                yield f" @ ${txn['unit_price']:.2f} = ${txn['total_amount']:.2f}"
+            
+            yield f"\n   Stock: {txn['previous_stock']} → {txn['new_stock']}\n"
+            
+            if customer_info:
+                yield f"   Customer: {customer_info}\n"
+            
+            if notes:
+                yield f"   Notes: {notes}\n"
+            
+            yield "\n"
+        
+        if transaction_count > 10:
+            yield f"... and {transaction_count - 10} more transactions\n"
+    
     def _show_product_history(self, message: str) -> str:
         """Show transaction history for a specific product."""
         try:
-            import re
-            
             # Extract product ID
-            product_match = re.search(r'\b([A-Z]+\d+)\b', message.upper())
-            product_id = product_match.group(1) if product_match else None
+            product_id = self._extract_product_id(message)
             
             if not product_id:
                 return """📊 **PRODUCT TRANSACTION HISTORY**
@@ -357,39 +401,39 @@ Please specify a product ID to view its transaction history.
                 summary = history["summary"]
                 transactions = history["transactions"]
                 
-                report = f"📊 **PRODUCT HISTORY: {product_id}**\n"
-                report += "═══════════════════════════════════════\n\n"
-                
-                report += f"📈 **Summary Statistics:**\n"
-                report += f"• Total Transactions: {history['total_transactions']}\n"
-                report += f"• Units Sold: {summary['total_sales']}\n"
-                report += f"• Units Purchased: {summary['total_purchases']}\n"
-                report += f"• Net Adjustments: {summary['total_adjustments']:+d}\n"
-                report += f"• Sales Revenue: ${summary['sales_revenue']:.2f}\n"
-                report += f"• Purchase Cost: ${summary['purchase_cost']:.2f}\n"
-                report += f"• **Net Profit: ${summary['net_profit']:.2f}**\n\n"
+                parts = [f"""📊 **PRODUCT HISTORY: {product_id}**
+═══════════════════════════════════════
+
+📈 **Summary Statistics:**
+• Total Transactions: {history['total_transactions']}
+• Units Sold: {summary['total_sales']}
+• Units Purchased: {summary['total_purchases']}
+• Net Adjustments: {summary['total_adjustments']:+d}
+• Sales Revenue: ${summary['sales_revenue']:.2f}
+• Purchase Cost: ${summary['purchase_cost']:.2f}
+• **Net Profit: ${summary['net_profit']:.2f}**
+
+"""]
+                append = parts.append
                 
                 if transactions:
-                    report += f"📋 **Recent Transactions:**\n"
-                    for txn in transactions[:5]:  # Show last 5
-                        txn_type_emoji = {
-                            "sale": "💰",
-                            "purchase": "📦", 
-                            "adjustment": "⚙️"
-                        }.get(txn["transaction_type"], "📄")
+                    append("📋 **Recent Transactions:**\n")
+                    for txn in islice(transactions, 5):  # Show last 5
+                        txn_type = txn["transaction_type"]
                         
-                        report += f"{txn_type_emoji} {txn['date']} - {txn['transaction_type'].title()}\n"
-                        report += f"   Quantity: {txn['quantity']:+d} units"
+                        append(f"{_TYPE_EMOJI.get(txn_type, _DEFAULT_TYPE_EMOJI)} {txn['date']} - {txn_type.title()}\n")
+                        append(f"   Quantity: {txn['quantity']:+d} units")
                         
-                        if txn['transaction_type'] != 'adjustment':
-                            report += f" @ ${txn['unit_price']:.2f}"
+                        if txn_type != 'adjustment':
+                            append(f" @ ${txn['unit_price']:.2f}")
                         
-                        report += f"\n   Stock: {txn['previous_stock']} → {txn['new_stock']}\n\n"
+                        append(f"\n   Stock: {txn['previous_stock']} → {txn['new_stock']}\n\n")
                     
-                    if len(transactions) > 5:
-                        report += f"... and {len(transactions) - 5} more transactions\n"
+                    remaining = len(transactions) - 5
+                    if remaining > 0:
+                        append(f"... and {remaining} more transactions\n")
                 
-                return report
+                return "".join(parts)
             else:
                 return f"❌ Error retrieving product history: {result.error}"
                 
@@ -401,39 +445,36 @@ Please specify a product ID to view its transaction history.
         try:
             summary = self.transaction_tool.get_daily_summary()
             
-            report = f"📅 **DAILY SUMMARY - {summary['date']}**\n"
-            report += "═══════════════════════════════════════\n\n"
-            
-            report += f"📊 **Overview:**\n"
-            report += f"• Total Transactions: {summary['total_transactions']}\n\n"
-            
-            # Sales summary
             sales = summary['sales']
-            report += f"💰 **Sales:**\n"
-            report += f"• Transactions: {sales['count']}\n"
-            report += f"• Units Sold: {sales['units_sold']}\n"
-            report += f"• **Revenue: ${sales['total_revenue']:.2f}**\n\n"
-            
-            # Purchases summary
             purchases = summary['purchases']
-            report += f"📦 **Purchases:**\n"
-            report += f"• Transactions: {purchases['count']}\n"
-            report += f"• Units Purchased: {purchases['units_purchased']}\n"
-            report += f"• **Cost: ${purchases['total_cost']:.2f}**\n\n"
-            
-            # Adjustments summary
             adjustments = summary['adjustments']
-            report += f"⚙️ **Adjustments:**\n"
-            report += f"• Transactions: {adjustments['count']}\n"
-            report += f"• Net Change: {adjustments['net_adjustment']:+d} units\n\n"
-            
-            # Net summary
             net_profit = sales['total_revenue'] - purchases['total_cost']
-            report += f"📈 **Net Results:**\n"
-            report += f"• **Gross Profit: ${net_profit:.2f}**\n"
-            report += f"• Net Unit Change: {sales['units_sold'] * -1 + purchases['units_purchased'] + adjustments['net_adjustment']:+d}\n"
+            net_unit_change = sales['units_sold'] * -1 + purchases['units_purchased'] + adjustments['net_adjustment']
             
-            return report
+            return f"""📅 **DAILY SUMMARY - {summary['date']}**
+═══════════════════════════════════════
+
+📊 **Overview:**
+• Total Transactions: {summary['total_transactions']}
+
+💰 **Sales:**
+• Transactions: {sales['count']}
+• Units Sold: {sales['units_sold']}
+• **Revenue: ${sales['total_revenue']:.2f}**
+
+📦 **Purchases:**
+• Transactions: {purchases['count']}
+• Units Purchased: {purchases['units_purchased']}
+• **Cost: ${purchases['total_cost']:.2f}**
+
+⚙️ **Adjustments:**
+• Transactions: {adjustments['count']}
+• Net Change: {adjustments['net_adjustment']:+d} units
+
+📈 **Net Results:**
+• **Gross Profit: ${net_profit:.2f}**
+• Net Unit Change: {net_unit_change:+d}
+"""
             
         except Exception as e:
             return f"❌ Error generating daily summary: {str(e)}"
@@ -441,49 +482,60 @@ Please specify a product ID to view its transaction history.
     def _generate_sales_report(self) -> str:
         """Generate sales analytics report."""
         try:
-            result = self.transaction_tool.execute(TransactionInput(action="list_transactions"))
+            result = self._list_transactions()
             
             if not result.success:
                 return f"❌ Error retrieving transactions: {result.error}"
             
             transactions = result.result
-            sales = [t for t in transactions if t["transaction_type"] == "sale"]
-            
-            if not sales:
-                return "📊 **No sales transactions found.**"
-            
-            # Calculate analytics
-            total_revenue = sum(t["total_amount"] for t in sales)
-            total_units = sum(abs(t["quantity"]) for t in sales)
-            avg_sale_value = total_revenue / len(sales) if sales else 0
             
-            # Product performance
+            # Calculate analytics and product performance in a single pass over the sales
+            sales_count = 0
+            total_revenue = 0
+            total_units = 0
             product_sales = {}
-            for sale in sales:
+            for sale in transactions:
+                if sale["transaction_type"] != "sale":
+                    continue
+                units = abs(sale["quantity"])
+                amount = sale["total_amount"]
+                sales_count += 1
+                total_revenue += amount
+                total_units += units
+                
                 pid = sale["product_id"]
-                if pid not in product_sales:
-                    product_sales[pid] = {"units": 0, "revenue": 0, "name": sale["product_name"]}
-                product_sales[pid]["units"] += abs(sale["quantity"])
-                product_sales[pid]["revenue"] += sale["total_amount"]
+                data = product_sales.get(pid)
+                if data is None:
+                    data = product_sales[pid] = {"units": 0, "revenue": 0, "name": sale["product_name"]}
+                data["units"] += units
+                data["revenue"] += amount
             
-            # Sort by revenue
-            top_products = sorted(product_sales.items(), key=lambda x: x[1]["revenue"], reverse=True)
+            if not sales_count:
+                return "📊 **No sales transactions found.**"
             
-            report = f"📊 **SALES ANALYTICS REPORT**\n"
-            report += "═══════════════════════════════════════\n\n"
+            avg_sale_value = total_revenue / sales_count
             
-            report += f"💰 **Overall Performance:**\n"
-            report += f"• Total Sales: {len(sales)} transactions\n"
-            report += f"• **Total Revenue: ${total_revenue:.2f}**\n"
-            report += f"• Units Sold: {total_units}\n"
-            report += f"• Average Sale Value: ${avg_sale_value:.2f}\n\n"
+            # Only the top 5 by revenue are shown
+            top_products = heapq.nlargest(5, product_sales.items(), key=lambda x: x[1]["revenue"])
             
-            report += f"🏆 **Top Performing Products:**\n"
-            for i, (pid, data) in enumerate(top_products[:5], 1):
-                report += f"{i}. **{data['name']}** ({pid})\n"
-                report += f"   Revenue: ${data['revenue']:.2f} | Units: {data['units']}\n"
+            parts = [f"""📊 **SALES ANALYTICS REPORT**
+═══════════════════════════════════════
+
+💰 **Overall Performance:**
+• Total Sales: {sales_count} transactions
+• **Total Revenue: ${total_revenue:.2f}**
+• Units Sold: {total_units}
+• Average Sale Value: ${avg_sale_value:.2f}
+
+🏆 **Top Performing Products:**
+"""]
+            append = parts.append
             
-            return report
+            for i, (pid, data) in enumerate(top_products, 1):
+                append(f"{i}. **{data['name']}** ({pid})\n")
+                append(f"   Revenue: ${data['revenue']:.2f} | Units: {data['units']}\n")
+            
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ Error generating sales report: {str(e)}"
@@ -518,4 +570,15 @@ I can help you with:
 🎯 **What transaction would you like to process?**
 
 Your message: "{message}"
-"""
\ No newline at end of file
+"""
+    
+    # Handler for each operation from _classify_transaction_request(), called with (self, message)
+    _OPERATION_HANDLERS = {
+        "sale": _handle_sale_request,
+        "purchase": _handle_purchase_request,
+        "adjustment": _handle_adjustment_request,
+        "transaction_history": _show_transaction_history,
+        "product_history": _show_product_history,
+        "daily_summary": lambda self, message: self._generate_daily_summary(),
+        "sales_report": lambda self, message: self._generate_sales_report()
+    }
\ No newline at end of file
@@ -30,6 +30,8 @@ class BaseTool(ABC):
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
+        # Input schema from _get_input_schema(), generated on the first get_schema() call
+        self._input_schema = None
     
     @abstractmethod
     def execute(self, input_data: ToolInput) -> ToolOutput:
@@ -48,13 +50,17 @@ class BaseTool(ABC):
         """
         Get the tool's input schema for agent integration.
         
+        The input schema is generated once per tool and shared by later calls.
+        
         Returns:
             Dict containing the tool's name, description, and input schema
         """
+        if self._input_schema is None:
+            self._input_schema = self._get_input_schema()
         return {
             "name": self.name,
             "description": self.description,
-            "input_schema": self._get_input_schema()
+            "input_schema": self._input_schema
         }
     
     @abstractmethod
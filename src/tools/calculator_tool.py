@@ -2,11 +2,21 @@
 Calculator tool - demonstrates basic tool creation from Python functions.
 """
 
+import operator
 from typing import Dict, Any
 from pydantic import BaseModel, Field
 from src.tools.base_tool import BaseTool, ToolInput, ToolOutput
 
 
+# Supported operations and the builtin each one calls
+_OPERATIONS = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv
+}
+
+
 class CalculatorInput(ToolInput):
     """Input schema for calculator operations."""
     operation: str = Field(description="The operation to perform: add, subtract, multiply, divide")
@@ -36,21 +46,14 @@ class CalculatorTool(BaseTool):
     
     def _calculate(self, operation: str, a: float, b: float) -> float:
         """Perform the actual calculation."""
-        operations = {
-            "add": lambda x, y: x + y,
-            "subtract": lambda x, y: x - y,
-            "multiply": lambda x, y: x * y,
-            "divide": lambda x, y: x / y if y != 0 else None
-        }
-        
-        if operation not in operations:
+        calculate = _OPERATIONS.get(operation)
+        if calculate is None:
             raise ValueError(f"Unknown operation: {operation}")
         
-        result = operations[operation](a, b)
-        if result is None:
+        if operation == "divide" and b == 0:
             raise ValueError("Division by zero")
         
-        return result
+        return calculate(a, b)
     
     def _get_input_schema(self) -> Dict[str, Any]:
         """Get the input schema for this tool."""
@@ -3,22 +3,38 @@ Google Sheets-powered inventory tool - demonstrates real-time cloud data integra
 """
 
 import os
-from typing import Dict, Any, List, Optional
+import time
+from collections import Counter
+from functools import lru_cache
+from importlib.util import find_spec
+from itertools import compress
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
 from pydantic import BaseModel, Field
 from src.tools.base_tool import BaseTool, ToolInput, ToolOutput
+from src.utils import sheet_writes
+
+# gspread (which brings google-auth) is only imported once a sheet is opened
+GSPREAD_AVAILABLE = find_spec("gspread") is not None
+
+# Seconds a listed set of products is reused before the sheet is read again
+_RECORDS_CACHE_TTL = 30
 
-try:
+
+@lru_cache(maxsize=1)
+def _load_gspread():
+    """The gspread module and the service account Credentials class, imported on first use."""
     import gspread
     from google.oauth2.service_account import Credentials
-    GSPREAD_AVAILABLE = True
-except ImportError:
-    GSPREAD_AVAILABLE = False
+    return gspread, Credentials
 
 
 class GoogleSheetsInventoryInput(ToolInput):
     """Input schema for Google Sheets inventory operations."""
-    action: str = Field(description="Action: 'check', 'update', 'add', 'list_all', 'search'")
+    action: str = Field(description="Action: 'check', 'batch_check', 'update', 'add', 'list_all', 'search'")
     product_id: Optional[str] = Field(default=None, description="Product ID (required for check/update)")
+    product_ids: Optional[List[str]] = Field(default=None, description="Product IDs (required for batch_check)")
     product_name: Optional[str] = Field(default=None, description="Product name (for add/search)")
     quantity: Optional[int] = Field(default=None, description="Quantity (for add/update)")
     price: Optional[float] = Field(default=None, description="Price (for add/update)")
@@ -55,8 +71,19 @@ class GoogleSheetsInventoryTool(BaseTool):
         
         self._client = None
         self._worksheet = None
+        # Rows of the public CSV export and where each of self.headers sits in them
         self._public_data = None
+        self._public_columns = ()
+        # Product ID -> position of its first row in _public_data
+        self._public_index = {}
+        # (quantity, price) per record of _public_data, None where they do not convert
+        self._public_values = []
         self._is_public_sheet = False
+        # requests.Session for the public CSV export, created on first use
+        self._http = None
+        # ((spreadsheet_id, worksheet_name), writes to it), time.monotonic(), products and
+        # their search fields from the last listing
+        self._records_cache = None
         
         if not GSPREAD_AVAILABLE:
             print("⚠️  gspread not installed. Install with: pip install gspread google-auth")
@@ -67,6 +94,7 @@ class GoogleSheetsInventoryTool(BaseTool):
             raise ImportError("gspread library not available. Install with: pip install gspread google-auth")
         
         if self._client is None:
+            gspread, Credentials = _load_gspread()
             try:
                 # First try service account credentials if available
                 if self.credentials_file and os.path.exists(self.credentials_file):
@@ -110,6 +138,7 @@ class GoogleSheetsInventoryTool(BaseTool):
                     return self._access_public_sheet()
                 
                 spreadsheet = client.open_by_key(self.spreadsheet_id)
+                gspread, _ = _load_gspread()
                 
                 try:
                     self._worksheet = spreadsheet.worksheet(self.worksheet_name)
@@ -132,25 +161,37 @@ class GoogleSheetsInventoryTool(BaseTool):
         
         return self._worksheet
     
+    def _get_http_session(self):
+        """HTTP session for public sheet exports, kept so its connections are reused."""
+        if self._http is None:
+            import requests
+            self._http = requests.Session()
+        return self._http
+    
     def _access_public_sheet(self):
         """Access public Google Sheet via CSV export."""
-        import requests
         import csv
-        from io import StringIO
+        from io import TextIOWrapper
         
         # Google Sheets CSV export URL for public sheets (without gid parameter)
         csv_url = f"https://docs.google.com/spreadsheets/d/{self.spreadsheet_id}/export?format=csv"
         
         try:
-            response = requests.get(csv_url, timeout=15)
-            response.raise_for_status()
-            
-            # Parse CSV data
-            csv_data = StringIO(response.text)
-            reader = csv.DictReader(csv_data)
-            
-            # Store data for later use
-            self._public_data = list(reader)
+            with self._get_http_session().get(csv_url, timeout=15, stream=True) as response:
+                response.raise_for_status()
+                
+                # Parse CSV data as it arrives instead of decoding the whole body first
+                response.raw.decode_content = True
+                csv_data = TextIOWrapper(response.raw, encoding=response.encoding or "utf-8",
+                                         errors="replace", newline="")
+                reader = csv.reader(csv_data)
+                
+                # Store data for later use
+                rows, columns, index, values = self._load_public_rows(reader)
+            self._public_data = rows
+            self._public_columns = columns
+            self._public_index = index
+            self._public_values = values
             self._is_public_sheet = True
             
             return "public_sheet_access"
@@ -158,6 +199,65 @@ class GoogleSheetsInventoryTool(BaseTool):
         except Exception as e:
             raise ValueError(f"Cannot access public sheet {self.spreadsheet_id}: {e}")
     
+    def _load_public_rows(self, reader) -> Tuple[List[List[Optional[str]]], Tuple[int, ...],
+                                                 Dict[str, int], List[Optional[Tuple[int, float]]]]:
+        """
+        Read the CSV rows in one pass, indexing and converting each as it arrives.
+        
+        Rows are kept as lists rather than one dict per row. Each is cut or padded to
+        the header width, short rows reading None as csv.DictReader gave them, and
+        ends with an extra empty cell that columns missing from the sheet point at.
+        
+        Returns the rows, the position of each of self.headers in them, a map from
+        each product ID to the position of the first row that has it, and every
+        row's (quantity, price).
+        """
+        fieldnames = next(reader, [])
+        width = len(fieldnames)
+        # Later duplicates of a header win, as they did in the DictReader records
+        positions = {name: i for i, name in enumerate(fieldnames)}
+        columns = tuple(positions.get(name, width) for name in self.headers)
+        id_column, _, quantity_column, price_column = columns[:4]
+        padding = [None] * width
+        
+        rows = []
+        index = {}
+        values = []
+        for row in reader:
+            if not row:
+                continue  # Blank lines are not records
+            if len(row) != width:
+                row = (row + padding)[:width]
+            row.append("")
+            
+            i = len(rows)
+            rows.append(row)
+            
+            product_id = row[id_column]
+            if product_id and product_id not in index:
+                index[product_id] = i
+            
+            try:
+                values.append(self._public_quantity_price(row, quantity_column, price_column))
+            except ValueError:
+                # Left to fail with the same error when the row is read
+                values.append(None)
+        return rows, columns, index, values
+    
+    @staticmethod
+    def _public_quantity_price(row: List[Optional[str]], quantity_column: int, price_column: int) -> Tuple[int, float]:
+        """Quantity and price of a CSV row, empty cells reading as zero."""
+        quantity = row[quantity_column]
+        price = row[price_column]
+        return int(quantity) if quantity else 0, float(price) if price else 0.0
+    
+    def _public_values_at(self, i: int) -> Tuple[int, float]:
+        """Converted quantity and price of _public_data[i]."""
+        values = self._public_values[i]
+        if values is not None:
+            return values
+        return self._public_quantity_price(self._public_data[i], self._public_columns[2], self._public_columns[3])
+    
     def execute(self, input_data: GoogleSheetsInventoryInput) -> ToolOutput:
         """Execute the inventory operation."""
         try:
@@ -170,6 +270,8 @@ class GoogleSheetsInventoryTool(BaseTool):
             
             if input_data.action == "check":
                 result = self._check_product(input_data.product_id)
+            elif input_data.action == "batch_check":
+                result = self._check_products(input_data.product_ids)
             elif input_data.action == "update":
                 result = self._update_product(input_data.product_id, input_data.quantity, input_data.price)
             elif input_data.action == "add":
@@ -199,20 +301,25 @@ class GoogleSheetsInventoryTool(BaseTool):
         
         # Handle public sheet access
         if self._is_public_sheet and self._public_data:
-            for i, record in enumerate(self._public_data):
-                if record.get("Product ID") == product_id:
-                    quantity = int(record.get("Quantity", 0)) if record.get("Quantity") else 0
-                    return {
-                        "product_id": record.get("Product ID", ""),
-                        "product_name": record.get("Product Name", ""),
-                        "quantity": quantity,
-                        "price": float(record.get("Price", 0)) if record.get("Price") else 0.0,
-                        "category": record.get("Category", ""),
-                        "status": record.get("Status", self._calculate_status(quantity)),
-                        "last_updated": record.get("Last Updated", ""),
-                        "row_number": i + 2  # +2 for header row and 0-based index
-                    }
-            raise ValueError(f"Product {product_id} not found in inventory")
+            i = self._public_index.get(product_id)
+            if i is None:
+                raise ValueError(f"Product {product_id} not found in inventory")
+            
+            row = self._public_data[i]
+            id_column, name_column, _, _, category_column, status_column, updated_column = self._public_columns
+            quantity, price = self._public_values_at(i)
+            # A sheet without a Status column points it at the trailing empty cell
+            has_status = status_column < len(row) - 1
+            return {
+                "product_id": row[id_column],
+                "product_name": row[name_column],
+                "quantity": quantity,
+                "price": price,
+                "category": row[category_column],
+                "status": row[status_column] if has_status else self._calculate_status(quantity),
+                "last_updated": row[updated_column],
+                "row_number": i + 2  # +2 for header row and 0-based index
+            }
         
         # Original gspread method
         worksheet = self._get_worksheet()
@@ -221,25 +328,72 @@ class GoogleSheetsInventoryTool(BaseTool):
         try:
             cell = worksheet.find(product_id)
             row_data = worksheet.row_values(cell.row)
-            
-            if len(row_data) >= len(self.headers):
-                quantity = int(row_data[2]) if row_data[2] else 0
-                return {
-                    "product_id": row_data[0],
-                    "product_name": row_data[1],
-                    "quantity": quantity,
-                    "price": float(row_data[3]) if row_data[3] else 0.0,
-                    "category": row_data[4] if len(row_data) > 4 else "",
-                    "status": row_data[5] if len(row_data) > 5 else self._calculate_status(quantity),
-                    "last_updated": row_data[6] if len(row_data) > 6 else "",
-                    "row_number": cell.row
-                }
-            else:
-                raise ValueError(f"Incomplete data for product {product_id}")
+            return self._product_from_row(product_id, row_data, cell.row)
                 
         except Exception:  # Catch all exceptions instead of specific gspread.CellNotFound
             raise ValueError(f"Product {product_id} not found in inventory")
     
+    def _product_from_row(self, product_id: str, row_data: List[str], row_number: int) -> Dict[str, Any]:
+        """Product record for a worksheet row read with its trailing empty cells dropped."""
+        if len(row_data) >= len(self.headers):
+            quantity = int(row_data[2]) if row_data[2] else 0
+            return {
+                "product_id": row_data[0],
+                "product_name": row_data[1],
+                "quantity": quantity,
+                "price": float(row_data[3]) if row_data[3] else 0.0,
+                "category": row_data[4] if len(row_data) > 4 else "",
+                "status": row_data[5] if len(row_data) > 5 else self._calculate_status(quantity),
+                "last_updated": row_data[6] if len(row_data) > 6 else "",
+                "row_number": row_number
+            }
+        else:
+            raise ValueError(f"Incomplete data for product {product_id}")
+    
+    def _check_products(self, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Check several products with one read of the sheet.
+        
+        Returns what a single check returns for each product, by product ID. Products a
+        single check would not find (or could not read) are left out, so callers can check
+        those on their own to report the error.
+        """
+        if not product_ids:
+            raise ValueError("Product IDs are required for batch_check operation")
+        
+        worksheet = self._get_worksheet()
+        products = {}
+        
+        # Public sheets are already held in memory and indexed
+        if self._is_public_sheet:
+            for product_id in product_ids:
+                try:
+                    products[product_id] = self._check_product(product_id)
+                except Exception:
+                    pass
+            return products
+        
+        # One read instead of a find() and a row_values() request per product. Like
+        # find(), a product is the first cell holding its ID, scanning row by row.
+        values = worksheet.get_all_values()
+        wanted = set(product_ids)
+        rows = {}
+        for row_number, row in enumerate(values, 1):
+            for value in row:
+                if value in wanted and value not in rows:
+                    rows[value] = row_number
+        
+        for product_id, row_number in rows.items():
+            row_data = list(values[row_number - 1])
+            # row_values() leaves out the trailing empty cells get_all_values() pads
+            while row_data and row_data[-1] == "":
+                row_data.pop()
+            try:
+                products[product_id] = self._product_from_row(product_id, row_data, row_number)
+            except Exception:
+                pass
+        return products
+    
     def _update_product(self, product_id: str, quantity: Optional[int], price: Optional[float]) -> Dict[str, Any]:
         """Update product quantity and/or price in Google Sheets."""
         if not product_id:
@@ -256,31 +410,52 @@ class GoogleSheetsInventoryTool(BaseTool):
         if self._is_public_sheet or worksheet == "public_sheet_access":
             raise ValueError("Cannot update products in public sheet. Sheet is read-only. Please use a private Google Sheet with proper API credentials for write access.")
         
-        # Update fields
+        # Updated data, built from the row just read instead of fetching it again
+        updated_data = dict(current_data)
+        cell_updates = []
         updates = []
         if quantity is not None:
-            worksheet.update_cell(row_number, 3, quantity)  # Quantity column
-            worksheet.update_cell(row_number, 6, self._calculate_status(quantity))  # Status column
+            status = self._calculate_status(quantity)
+            cell_updates.append({"range": f"C{row_number}", "values": [[quantity]]})  # Quantity column
+            cell_updates.append({"range": f"F{row_number}", "values": [[status]]})  # Status column
+            updated_data["quantity"] = quantity
+            updated_data["status"] = status
             updates.append(f"quantity: {quantity}")
         
         if price is not None:
-            worksheet.update_cell(row_number, 4, price)  # Price column
+            cell_updates.append({"range": f"D{row_number}", "values": [[price]]})  # Price column
+            updated_data["price"] = price
             updates.append(f"price: {price}")
         
         # Update timestamp
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        worksheet.update_cell(row_number, 7, timestamp)  # Last Updated column
+        cell_updates.append({"range": f"G{row_number}", "values": [[timestamp]]})  # Last Updated column
+        updated_data["last_updated"] = timestamp
+        
+        # All cells in one request, entered as update_cell would enter them
+        worksheet.batch_update(cell_updates, value_input_option="USER_ENTERED")
+        self.invalidate_records_cache()
         
-        # Return updated data
-        updated_data = self._check_product(product_id)
         updated_data["updates_made"] = updates
         return updated_data
     
     def _add_product(self, product_id: str, product_name: str, quantity: int, price: float, category: str) -> Dict[str, Any]:
         """Add a new product to the Google Sheet."""
-        if not all([product_id, product_name, quantity is not None, price is not None, category]):
-            raise ValueError("All fields required: product_id, product_name, quantity, price, category")
+        return self._add_products([{
+            "product_id": product_id,
+            "product_name": product_name,
+            "quantity": quantity,
+            "price": price,
+            "category": category
+        }])[0]
+    
+    def _add_products(self, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add new products to the Google Sheet, appending all their rows in one request."""
+        for product in products:
+            if not all([product["product_id"], product["product_name"], product["quantity"] is not None,
+                        product["price"] is not None, product["category"]]):
+                raise ValueError("All fields required: product_id, product_name, quantity, price, category")
         
         # Get worksheet first to check if it's a public sheet
         worksheet = self._get_worksheet()
@@ -289,63 +464,109 @@ class GoogleSheetsInventoryTool(BaseTool):
         if self._is_public_sheet or worksheet == "public_sheet_access":
             raise ValueError("Cannot add products to public sheet. Sheet is read-only. Please use a private Google Sheet with proper API credentials for write access.")
         
-        # Check if product already exists
-        try:
-            worksheet.find(product_id)
-            raise ValueError(f"Product {product_id} already exists")
-        except Exception:
-            pass  # Good, product doesn't exist (catch all exceptions instead of specific gspread.CellNotFound)
-        
-        # Add new row
+        # Add new rows
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        status = self._calculate_status(quantity)
-        
-        new_row = [product_id, product_name, quantity, price, category, status, timestamp]
-        worksheet.append_row(new_row)
         
-        return {
-            "product_id": product_id,
-            "product_name": product_name,
-            "quantity": quantity,
-            "price": price,
-            "category": category,
-            "status": status,
-            "last_updated": timestamp,
-            "message": "Product added successfully"
-        }
+        added = []
+        new_rows = []
+        for product in products:
+            status = self._calculate_status(product["quantity"])
+            new_rows.append([product["product_id"], product["product_name"], product["quantity"],
+                             product["price"], product["category"], status, timestamp])
+            added.append({
+                "product_id": product["product_id"],
+                "product_name": product["product_name"],
+                "quantity": product["quantity"],
+                "price": product["price"],
+                "category": product["category"],
+                "status": status,
+                "last_updated": timestamp,
+                "message": "Product added successfully"
+            })
+        
+        worksheet.append_rows(new_rows)
+        self.invalidate_records_cache()
+        
+        return added
+    
+    def write_version(self) -> int:
+        """Number of writes made to this sheet through any tool instance; reads cached before a write are stale."""
+        return sheet_writes.write_version((self.spreadsheet_id, self.worksheet_name))
+    
+    def invalidate_records_cache(self):
+        """Drop the cached product lists of this sheet, in every tool instance, so the next listing reads it again."""
+        sheet_writes.record_write((self.spreadsheet_id, self.worksheet_name))
+        self._records_cache = None
     
     def _list_all_products(self) -> List[Dict[str, Any]]:
+        """List all products, reusing a listing read within the last _RECORDS_CACHE_TTL seconds."""
+        # Copies, so callers that enrich the dicts do not change the cached products
+        return [dict(product) for product in self._cached_products()[0]]
+    
+    def _cached_products(self) -> Tuple[List[Dict[str, Any]], Optional[List[Tuple[str, str, str]]]]:
+        """
+        Cached products with their lowercased (name, id, category) search fields.
+        
+        The search fields are None when one of them is not text, such as a numericised
+        cell or a cell missing from a short CSV row.
+        """
+        version = (self.spreadsheet_id, self.worksheet_name, self.write_version())
+        now = time.monotonic()
+        cache = self._records_cache
+        if cache is not None and cache[0] == version and now - cache[1] < _RECORDS_CACHE_TTL:
+            return cache[2], cache[3]
+        
+        products = self._read_all_products()
+        try:
+            search_fields = [
+                (p["product_name"].lower(), p["product_id"].lower(), p["category"].lower())
+                for p in products
+            ]
+        except AttributeError:
+            search_fields = None
+        self._records_cache = (version, now, products, search_fields)
+        return products, search_fields
+    
+    def _read_all_products(self) -> List[Dict[str, Any]]:
         """List all products from the Google Sheet."""
         worksheet = self._get_worksheet()
         
         # Handle public sheet access
         if self._is_public_sheet and self._public_data:
+            id_column, name_column, _, _, category_column, status_column, updated_column = self._public_columns
             products = []
-            for record in self._public_data:
-                if record.get("Product ID"):  # Skip empty rows
-                    products.append({
-                        "product_id": record.get("Product ID", ""),
-                        "product_name": record.get("Product Name", ""),
-                        "quantity": int(record.get("Quantity", 0)) if record.get("Quantity") else 0,
-                        "price": float(record.get("Price", 0)) if record.get("Price") else 0.0,
-                        "category": record.get("Category", ""),
-                        "status": record.get("Status", ""),
-                        "last_updated": record.get("Last Updated", "")
+            append = products.append
+            for i, row in enumerate(self._public_data):
+                product_id = row[id_column]
+                if product_id:  # Skip empty rows
+                    quantity, price = self._public_values_at(i)
+                    append({
+                        "product_id": product_id,
+                        "product_name": row[name_column],
+                        "quantity": quantity,
+                        "price": price,
+                        "category": row[category_column],
+                        "status": row[status_column],
+                        "last_updated": row[updated_column]
                     })
             return products
         
         # Original gspread method
-        records = worksheet.get_all_records()
+        records = self._get_sheet_records(worksheet)
         
         products = []
+        append = products.append
         for record in records:
-            if record.get("Product ID"):  # Skip empty rows
-                products.append({
-                    "product_id": record.get("Product ID", ""),
+            product_id = record.get("Product ID")
+            if product_id:  # Skip empty rows
+                quantity = record.get("Quantity")
+                price = record.get("Price")
+                append({
+                    "product_id": product_id,
                     "product_name": record.get("Product Name", ""),
-                    "quantity": int(record.get("Quantity", 0)) if record.get("Quantity") else 0,
-                    "price": float(record.get("Price", 0)) if record.get("Price") else 0.0,
+                    "quantity": int(quantity) if quantity else 0,
+                    "price": float(price) if price else 0.0,
                     "category": record.get("Category", ""),
                     "status": record.get("Status", ""),
                     "last_updated": record.get("Last Updated", "")
@@ -353,31 +574,53 @@ class GoogleSheetsInventoryTool(BaseTool):
         
         return products
     
+    @staticmethod
+    def _get_sheet_records(worksheet) -> List[Dict[str, Any]]:
+        """
+        worksheet.get_all_records(), read from the A:G product columns only.
+        
+        Rows are keyed by the sheet's own header row and numericised as
+        get_all_records() does, so scratch columns past G are not downloaded.
+        """
+        from gspread.utils import numericise_all
+        
+        rows = worksheet.get("A:G", pad_values=True)
+        if not rows or rows == [[]]:
+            return []
+        
+        keys = rows[0]
+        return [dict(zip(keys, numericise_all(row))) for row in rows[1:]]
+    
     def _search_products(self, search_term: Optional[str], category: Optional[str]) -> List[Dict[str, Any]]:
         """Search products by name or category."""
-        all_products = self._list_all_products()
+        all_products, search_fields = self._cached_products()
         
         if not search_term and not category:
-            return all_products
-        
-        filtered_products = []
-        for product in all_products:
-            match = True
-            
-            if search_term:
-                search_lower = search_term.lower()
-                if not (search_lower in product["product_name"].lower() or 
-                       search_lower in product["product_id"].lower()):
-                    match = False
-            
-            if category and match:
-                if category.lower() not in product["category"].lower():
-                    match = False
-            
-            if match:
-                filtered_products.append(product)
-        
-        return filtered_products
+            return [dict(product) for product in all_products]
+        
+        search_lower = search_term.lower() if search_term else None
+        category_lower = category.lower() if category else None
+        
+        if search_fields is None:
+            # Lowered per product, so fields that are not text fail as they always have
+            return [
+                dict(product) for product in all_products
+                if (search_lower is None
+                    or search_lower in product["product_name"].lower()
+                    or search_lower in product["product_id"].lower())
+                and (category_lower is None or category_lower in product["category"].lower())
+            ]
+        
+        # One predicate per combination of criteria, so no row re-checks which were given
+        if category_lower is None:
+            matches = (search_lower in name or search_lower in product_id
+                       for name, product_id, _ in search_fields)
+        elif search_lower is None:
+            matches = (category_lower in product_category for _, _, product_category in search_fields)
+        else:
+            matches = ((search_lower in name or search_lower in product_id) and category_lower in product_category
+                       for name, product_id, product_category in search_fields)
+        return [dict(product) for product in compress(all_products, matches)]
     
     def _calculate_status(self, quantity: int) -> str:
         """Calculate stock status based on quantity."""
@@ -393,23 +636,24 @@ class GoogleSheetsInventoryTool(BaseTool):
         try:
             worksheet = self._get_worksheet()
             
-            # Get basic info
+            # Get basic info. worksheet.row_count is the grid size, not the rows in use,
+            # so the used rows are still counted here; the products come from the cache.
             row_count = len(worksheet.get_all_values())
-            products = self._list_all_products()
+            products = self._cached_products()[0]
             
             # Calculate statistics
             total_products = len(products)
-            total_value = sum(p["quantity"] * p["price"] for p in products)
-            
-            status_counts = {}
-            category_counts = {}
+            if products:
+                count = len(products)
+                quantities = np.fromiter((p["quantity"] for p in products), dtype=np.float64, count=count)
+                prices = np.fromiter((p["price"] for p in products), dtype=np.float64, count=count)
+                # cumsum adds in row order, so the total rounds exactly as a running sum would
+                total_value = float(np.cumsum(quantities * prices)[-1])
+            else:
+                total_value = 0
             
-            for product in products:
-                status = product["status"]
-                category = product["category"]
-                
-                status_counts[status] = status_counts.get(status, 0) + 1
-                category_counts[category] = category_counts.get(category, 0) + 1
+            status_counts = dict(Counter(p["status"] for p in products))
+            category_counts = dict(Counter(p["category"] for p in products))
             
             return {
                 "spreadsheet_id": self.spreadsheet_id,
@@ -466,6 +710,14 @@ class MockGoogleSheetsInventoryTool(BaseTool):
                 else:
                     return ToolOutput(success=False, result=None, error=f"Product {input_data.product_id} not found")
             
+            elif input_data.action == "batch_check":
+                wanted = set(input_data.product_ids or ())
+                result = {}
+                for product in self.mock_data:
+                    if product["product_id"] in wanted and product["product_id"] not in result:
+                        result[product["product_id"]] = dict(product, message="📊 Data from Google Sheets (Mock)")
+                return ToolOutput(success=True, result=result)
+            
             elif input_data.action == "list_all":
                 result = [dict(p) for p in self.mock_data]
                 return ToolOutput(success=True, result=result)
@@ -476,6 +728,10 @@ class MockGoogleSheetsInventoryTool(BaseTool):
         except Exception as e:
             return ToolOutput(success=False, result=None, error=str(e))
     
+    def write_version(self) -> int:
+        """The mock data is never written, so it always has the same version."""
+        return 0
+    
     def _get_input_schema(self) -> Dict[str, Any]:
         return GoogleSheetsInventoryInput.model_json_schema()
 
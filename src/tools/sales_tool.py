@@ -3,12 +3,31 @@ Sales Tool - Enhanced sales processing with automatic stock management and alert
 """
 
 import os
+import time
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+import numpy as np
 from pydantic import BaseModel, Field
 from src.tools.base_tool import BaseTool, ToolInput, ToolOutput
 from src.tools.google_sheets_inventory_tool import GoogleSheetsInventoryTool, GoogleSheetsInventoryInput
 from src.tools.transaction_tool import TransactionTool, TransactionInput
+from src.utils.stock_math import bucket_stock_levels
+
+
+def _running_sum(values: np.ndarray) -> Any:
+    """Sum of values added up in order as sum() does, so float totals match it exactly (0 when empty)."""
+    return np.cumsum(values)[-1].item() if values.size else 0
+
+
+# Alert raised for each stock level after a sale: level, message, action required, impact
+_STOCK_ALERTS = {
+    "out_of_stock": ("critical", "{name} is now OUT OF STOCK",
+                     "Immediate restock required", "Cannot process further sales"),
+    "critical_stock": ("high", "{name} has critical stock level: {stock} units",
+                       "Urgent reorder needed", "Limited sales capacity"),
+    "low_stock": ("medium", "{name} has low stock: {stock} units",
+                  "Plan reorder within 1-2 weeks", "Monitor sales closely")
+}
 
 
 class SalesInput(ToolInput):
@@ -35,7 +54,7 @@ class SalesTool(BaseTool):
     - Stock availability checking
     """
     
-    def __init__(self, spreadsheet_id: Optional[str] = None):
+    def __init__(self, spreadsheet_id: Optional[str] = None, cache_ttl: float = 2.0):
         super().__init__(
             name="sales_tool",
             description="Enhanced sales processing with automatic inventory management and alerts"
@@ -49,6 +68,12 @@ class SalesTool(BaseTool):
         self.low_stock_threshold = 10
         self.critical_stock_threshold = 5
         self.out_of_stock_threshold = 0
+        
+        # A check result is reused while no tool has written to the sheet since it was read,
+        # so a burst of calls for the same product reads the sheet once. cache_ttl only bounds
+        # how long edits made outside this process can go unseen.
+        self.cache_ttl = cache_ttl
+        self._product_cache = {}  # product_id -> (sheet write version, monotonic time, product)
     
     def execute(self, input_data: SalesInput) -> ToolOutput:
         """Execute sales operations."""
@@ -78,8 +103,14 @@ class SalesTool(BaseTool):
             return ToolOutput(success=False, result=None, error=str(e))
     
     def _process_quick_sale(self, product_id: str, quantity: int, unit_price: float = None, 
-                           customer_info: str = None, notes: str = None) -> Dict[str, Any]:
-        """Process a quick sale with enhanced stock management."""
+                           customer_info: str = None, notes: str = None,
+                           inventory: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Process a quick sale with enhanced stock management.
+        
+        inventory is a bulk sale's snapshot of the products by ID. The product is read
+        from it instead of the sheet, and its stock is brought up to date after the sale.
+        """
         if not product_id or not quantity:
             raise ValueError("Product ID and quantity are required for sales")
         
@@ -87,20 +118,8 @@ class SalesTool(BaseTool):
             raise ValueError("Sale quantity must be positive")
         
         # Get current product info
-        product_result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="check", product_id=product_id))
-        
-        if not product_result.success:
-            raise ValueError(f"Product {product_id} not found: {product_result.error}")
-        
-        product = product_result.result
-        current_stock = product["quantity"]
-        
-        # Enhanced stock validation
-        if current_stock <= 0:
-            raise ValueError(f"Product {product_id} is OUT OF STOCK. Cannot process sale.")
-        
-        if current_stock < quantity:
-            raise ValueError(f"Insufficient stock for {product_id}. Available: {current_stock}, Requested: {quantity}")
+        product = self._get_sale_product(product_id, inventory)
+        current_stock = self._validate_sale(product_id, product, quantity)
         
         # Use product price if not specified
         if not unit_price:
@@ -122,14 +141,35 @@ class SalesTool(BaseTool):
         if not sale_result.success:
             raise ValueError(f"Failed to process sale: {sale_result.error}")
         
-        sale_data = sale_result.result
+        if inventory is not None:
+            inventory[product_id] = dict(product, quantity=new_stock)
+        
+        return self._build_sale_row(
+            product_id, product, quantity, unit_price, customer_info, current_stock, new_stock,
+            sale_result.result["transaction_id"], datetime.now().isoformat()
+        )
+    
+    @staticmethod
+    def _validate_sale(product_id: str, product: Dict[str, Any], quantity: int) -> int:
+        """The product's current stock, after checking it can cover the sale."""
+        current_stock = product["quantity"]
+        
+        # Enhanced stock validation
+        if current_stock <= 0:
+            raise ValueError(f"Product {product_id} is OUT OF STOCK. Cannot process sale.")
         
-        # Generate stock alerts
-        stock_alerts = self._generate_stock_alert_for_product(product, new_stock)
+        if current_stock < quantity:
+            raise ValueError(f"Insufficient stock for {product_id}. Available: {current_stock}, Requested: {quantity}")
         
+        return current_stock
+    
+    def _build_sale_row(self, product_id: str, product: Dict[str, Any], quantity: int, unit_price: float,
+                        customer_info: Optional[str], current_stock: int, new_stock: int,
+                        transaction_id: str, timestamp: str) -> Dict[str, Any]:
+        """Result reported for one completed sale, with the stock alerts it raised."""
         return {
             "sale_completed": True,
-            "transaction_id": sale_data["transaction_id"],
+            "transaction_id": transaction_id,
             "product_info": {
                 "product_id": product_id,
                 "product_name": product["product_name"],
@@ -146,17 +186,64 @@ class SalesTool(BaseTool):
                 "new_stock": new_stock,
                 "stock_change": -quantity
             },
-            "alerts": stock_alerts,
-            "timestamp": datetime.now().isoformat()
+            "alerts": self._generate_stock_alert_for_product(product, new_stock),
+            "timestamp": timestamp
         }
     
+    def _get_product(self, product_id: str) -> ToolOutput:
+        """
+        Check result for a product. A successful check is reused until a tool writes to the
+        sheet, or for at most cache_ttl seconds.
+        """
+        # Read before checking, so a write made during the check leaves the entry stale
+        version = self.inventory_tool.write_version()
+        now = time.monotonic()
+        cached = self._product_cache.get(product_id)
+        if cached is not None and cached[0] == version and now - cached[1] < self.cache_ttl:
+            return ToolOutput(success=True, result=dict(cached[2]))
+        
+        result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="check", product_id=product_id))
+        if result.success:
+            self._product_cache[product_id] = (version, now, dict(result.result))
+        return result
+    
+    def _get_sale_product(self, product_id: str, inventory: Optional[Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """The product being sold, from the inventory snapshot when it has it, else checked in the sheet."""
+        product = inventory.get(product_id) if inventory is not None else None
+        if product is None:
+            product_result = self._get_product(product_id)
+            
+            if not product_result.success:
+                raise ValueError(f"Product {product_id} not found: {product_result.error}")
+            
+            product = product_result.result
+        return product
+    
+    def _fetch_inventory_map(self, product_ids: List[Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        The products found for product_ids by ID, from a single batch_check, or None when
+        they cannot be checked together.
+        """
+        product_ids = [product_id for product_id in product_ids if product_id]
+        if not product_ids:
+            return None
+        
+        try:
+            batch = GoogleSheetsInventoryInput(action="batch_check", product_ids=product_ids)
+        except ValueError:
+            # An ID that is not text; each item is checked, and reports it, on its own
+            return None
+        
+        result = self.inventory_tool.execute(batch)
+        return result.result if result.success else None
+    
     def _check_availability(self, product_id: str) -> Dict[str, Any]:
         """Check detailed stock availability for a product."""
         if not product_id:
             raise ValueError("Product ID is required for availability check")
         
         # Get product info
-        result = self.inventory_tool.execute(GoogleSheetsInventoryInput(action="check", product_id=product_id))
+        result = self._get_product(product_id)
         
         if not result.success:
             raise ValueError(f"Product {product_id} not found: {result.error}")
@@ -221,6 +308,11 @@ class SalesTool(BaseTool):
         total_amount = 0
         stock_alerts = []
         
+        # One inventory read for the whole sale instead of a check per item; items the
+        # batch did not find (or every item, if it failed) are still checked on their own
+        inventory = self._fetch_inventory_map([product_data.get("product_id") for product_data in products])
+        notes = f"Bulk sale item - {len(products)} products total"
+        
         for product_data in products:
             try:
                 product_id = product_data.get("product_id")
@@ -233,7 +325,8 @@ class SalesTool(BaseTool):
                     quantity=quantity,
                     unit_price=unit_price,
                     customer_info=customer_info,
-                    notes=f"Bulk sale item - {len(products)} products total"
+                    notes=notes,
+                    inventory=inventory
                 )
                 
                 successful_sales.append(sale_result)
@@ -282,43 +375,38 @@ class SalesTool(BaseTool):
                     "message": "No sales data available for analysis"
                 }
             
+            # pandas is only needed for the analytics, so it is not paid for at import
+            import pandas as pd
+            
+            # One pass over the sales into columns; all totals are then array reductions
+            count = len(sales)
+            amounts = np.fromiter((t["total_amount"] for t in sales), dtype=np.float64, count=count)
+            units = np.abs(np.fromiter((t["quantity"] for t in sales), dtype=np.int64, count=count))
+            
             # Calculate basic metrics
-            total_revenue = sum(t["total_amount"] for t in sales)
-            total_units = sum(abs(t["quantity"]) for t in sales)
-            total_transactions = len(sales)
+            total_revenue = _running_sum(amounts)
+            total_units = int(units.sum())
+            total_transactions = count
             avg_sale_value = total_revenue / total_transactions if total_transactions > 0 else 0
             avg_units_per_sale = total_units / total_transactions if total_transactions > 0 else 0
             
-            # Product performance analysis
-            product_performance = {}
-            for sale in sales:
-                pid = sale["product_id"]
-                if pid not in product_performance:
-                    product_performance[pid] = {
-                        "product_name": sale["product_name"],
-                        "units_sold": 0,
-                        "revenue": 0,
-                        "transactions": 0,
-                        "avg_price": 0
-                    }
-                
-                product_performance[pid]["units_sold"] += abs(sale["quantity"])
-                product_performance[pid]["revenue"] += sale["total_amount"]
-                product_performance[pid]["transactions"] += 1
-            
-            # Calculate average prices
-            for pid, data in product_performance.items():
-                if data["units_sold"] > 0:
-                    data["avg_price"] = data["revenue"] / data["units_sold"]
+            # Product performance analysis, products numbered in order of their first sale
+            codes, product_ids = pd.factorize(np.array([t["product_id"] for t in sales], dtype=object))
+            size = len(product_ids)
+            _, first_sale = np.unique(codes, return_index=True)
+            # bincount adds each product's amounts in log order, as the running totals did
+            product_revenue = np.bincount(codes, weights=amounts, minlength=size).tolist()
+            product_units = np.bincount(codes, weights=units, minlength=size).astype(np.int64).tolist()
+            product_transactions = np.bincount(codes, minlength=size).tolist()
             
-            # Sort products by revenue
-            top_products = sorted(product_performance.items(), key=lambda x: x[1]["revenue"], reverse=True)
+            # Sort products by revenue, ties in order of first sale like a stable sort
+            top_products = np.argsort(-np.asarray(product_revenue), kind="stable")[:10].tolist()
             
             # Time-based analysis (simplified)
             today = datetime.now().strftime("%Y-%m-%d")
-            today_sales = [s for s in sales if s["date"] == today]
-            today_revenue = sum(t["total_amount"] for t in today_sales)
-            today_units = sum(abs(t["quantity"]) for t in today_sales)
+            today_mask = np.array([t["date"] for t in sales], dtype=object) == today
+            today_revenue = _running_sum(amounts[today_mask])
+            today_units = int(units[today_mask].sum())
             
             return {
                 "analytics_available": True,
@@ -332,18 +420,18 @@ class SalesTool(BaseTool):
                 "today_performance": {
                     "revenue": today_revenue,
                     "units_sold": today_units,
-                    "transactions": len(today_sales)
+                    "transactions": int(today_mask.sum())
                 },
                 "top_products": [
                     {
-                        "product_id": pid,
-                        "product_name": data["product_name"],
-                        "revenue": data["revenue"],
-                        "units_sold": data["units_sold"],
-                        "transactions": data["transactions"],
-                        "avg_price": data["avg_price"]
+                        "product_id": product_ids[i],
+                        "product_name": sales[first_sale[i]]["product_name"],
+                        "revenue": product_revenue[i],
+                        "units_sold": product_units[i],
+                        "transactions": product_transactions[i],
+                        "avg_price": product_revenue[i] / product_units[i] if product_units[i] > 0 else 0
                     }
-                    for pid, data in top_products[:10]
+                    for i in top_products
                 ],
                 "analysis_timestamp": datetime.now().isoformat()
             }
@@ -365,27 +453,25 @@ class SalesTool(BaseTool):
             
             products = result.result
             
-            # Categorize products by stock level
-            out_of_stock = []
-            critical_stock = []
-            low_stock = []
-            healthy_stock = []
+            count = len(products)
+            quantity = np.fromiter((p["quantity"] for p in products), dtype=np.int64, count=count)
+            price = np.fromiter((p["price"] for p in products), dtype=np.float64, count=count)
             
-            for product in products:
-                quantity = product["quantity"]
-                
-                if quantity <= self.out_of_stock_threshold:
-                    out_of_stock.append(product)
-                elif quantity <= self.critical_stock_threshold:
-                    critical_stock.append(product)
-                elif quantity <= self.low_stock_threshold:
-                    low_stock.append(product)
-                else:
-                    healthy_stock.append(product)
+            # Categorize products by stock level and add up the financial impact in one pass
+            # (lost revenue assumes 10 units average demand)
+            out_idx, critical_idx, low_idx, healthy_idx, lost, at_risk = bucket_stock_levels(
+                quantity, price, self.out_of_stock_threshold, self.critical_stock_threshold,
+                self.low_stock_threshold
+            )
             
-            # Calculate financial impact
-            lost_revenue_potential = sum(p["price"] * 10 for p in out_of_stock)  # Assume 10 units average demand
-            at_risk_revenue = sum(p["price"] * p["quantity"] for p in critical_stock)
+            out_of_stock = [products[i] for i in out_idx.tolist()]
+            critical_stock = [products[i] for i in critical_idx.tolist()]
+            low_stock = [products[i] for i in low_idx.tolist()]
+            healthy_count = len(healthy_idx)
+            
+            # An empty level totals 0, as sum() gives
+            lost_revenue_potential = float(lost) if out_of_stock else 0
+            at_risk_revenue = float(at_risk) if critical_stock else 0
             
             return {
                 "alert_timestamp": datetime.now().isoformat(),
@@ -394,7 +480,7 @@ class SalesTool(BaseTool):
                     "out_of_stock_count": len(out_of_stock),
                     "critical_stock_count": len(critical_stock),
                     "low_stock_count": len(low_stock),
-                    "healthy_stock_count": len(healthy_stock)
+                    "healthy_stock_count": healthy_count
                 },
                 "financial_impact": {
                     "lost_revenue_potential": lost_revenue_potential,
@@ -444,36 +530,30 @@ class SalesTool(BaseTool):
                 "alerts_available": False
             }
     
+    def _classify_stock(self, stock: int) -> Optional[str]:
+        """Alert type for a stock level, or None when the stock is healthy."""
+        if stock <= self.out_of_stock_threshold:
+            return "out_of_stock"
+        if stock <= self.critical_stock_threshold:
+            return "critical_stock"
+        if stock <= self.low_stock_threshold:
+            return "low_stock"
+        return None
+    
     def _generate_stock_alert_for_product(self, product: Dict[str, Any], new_stock: int) -> List[Dict[str, Any]]:
         """Generate stock alerts for a specific product after sale."""
-        alerts = []
-        
-        if new_stock <= self.out_of_stock_threshold:
-            alerts.append({
-                "level": "critical",
-                "type": "out_of_stock",
-                "message": f"{product['product_name']} is now OUT OF STOCK",
-                "action_required": "Immediate restock required",
-                "impact": "Cannot process further sales"
-            })
-        elif new_stock <= self.critical_stock_threshold:
-            alerts.append({
-                "level": "high",
-                "type": "critical_stock",
-                "message": f"{product['product_name']} has critical stock level: {new_stock} units",
-                "action_required": "Urgent reorder needed",
-                "impact": "Limited sales capacity"
-            })
-        elif new_stock <= self.low_stock_threshold:
-            alerts.append({
-                "level": "medium",
-                "type": "low_stock",
-                "message": f"{product['product_name']} has low stock: {new_stock} units",
-                "action_required": "Plan reorder within 1-2 weeks",
-                "impact": "Monitor sales closely"
-            })
-        
-        return alerts
+        alert_type = self._classify_stock(new_stock)
+        if alert_type is None:
+            return []
+        
+        level, message, action_required, impact = _STOCK_ALERTS[alert_type]
+        return [{
+            "level": level,
+            "type": alert_type,
+            "message": message.format(name=product["product_name"], stock=new_stock),
+            "action_required": action_required,
+            "impact": impact
+        }]
     
     def _generate_stock_recommendations(self, out_of_stock: List, critical_stock: List, low_stock: List) -> List[str]:
         """Generate actionable stock recommendations."""
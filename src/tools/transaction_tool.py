@@ -8,6 +8,10 @@ from datetime import datetime
 from pydantic import BaseModel, Field
 from src.tools.base_tool import BaseTool, ToolInput, ToolOutput
 from src.tools.google_sheets_inventory_tool import GoogleSheetsInventoryTool, GoogleSheetsInventoryInput
+from src.utils import sheet_writes
+
+# Name the transaction records are counted under in src.utils.sheet_writes
+_TRANSACTIONS_SHEET = "Transactions"
 
 
 class TransactionInput(ToolInput):
@@ -285,9 +289,14 @@ class TransactionTool(BaseTool):
         
         # Store transaction (in production, save to database or Google Sheets)
         self.transactions.append(transaction)
+        sheet_writes.record_write((self.spreadsheet_id, _TRANSACTIONS_SHEET))
         
         return transaction
     
+    def write_version(self) -> int:
+        """Number of transactions recorded for this spreadsheet through any tool instance; listings read before a record are stale."""
+        return sheet_writes.write_version((self.spreadsheet_id, _TRANSACTIONS_SHEET))
+    
     def _list_transactions(self, limit: int = 50) -> List[Dict[str, Any]]:
         """List recent transactions."""
         # Sort by date/time descending (most recent first)
@@ -0,0 +1,24 @@
+"""
+Per-sheet write counters shared by every tool instance in the process.
+
+A tool that caches what it read from a sheet stores write_version(key) with it and
+reuses the cache only while that version is unchanged; record_write(key) after each
+write makes every such cache stale. The counters live here rather than in a tool
+module because scripts that put src on sys.path import the tools both as tools.* and
+as src.tools.*, which are separate module objects, while this module is always
+imported as src.utils.sheet_writes.
+"""
+
+from typing import Dict, Hashable
+
+_writes: Dict[Hashable, int] = {}
+
+
+def write_version(key: Hashable) -> int:
+    """Number of writes recorded for key so far."""
+    return _writes.get(key, 0)
+
+
+def record_write(key: Hashable) -> None:
+    """Count a write to key, so caches stored with an earlier version are stale."""
+    _writes[key] = _writes.get(key, 0) + 1
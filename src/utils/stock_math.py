@@ -0,0 +1,213 @@
+"""
+Numeric kernels shared by the stock calculator reports and the sales tool's stock alerts.
+
+compute_stock_levels(qty, daily, price, lead, safety, carry, ord_cost) returns the
+(eoq, reorder, min_stock, max_stock, status) arrays for every product. It is the
+per-product loop compiled with numba when numba is installed, and an equivalent
+NumPy implementation otherwise. numba is only imported when the kernel is first
+needed (or by warm_up()), so importing this module stays cheap.
+
+classify_cumulative(values, total, breaks) gives each position of a ranked value column
+the number of breaks its running share of total (in percent) has passed, in one pass.
+
+bucket_stock_levels(qty, price, out_of_stock, critical, low) splits the products into
+out of stock, critical, low and healthy positions by those thresholds, and adds up the
+out-of-stock lost revenue and critical at-risk revenue, in one pass.
+
+safe_divide(num, den, fill) divides element-wise where den > 0 and uses fill elsewhere.
+"""
+
+from importlib.util import find_spec
+from typing import Callable, Tuple
+
+import numpy as np
+
+NUMBA_AVAILABLE = find_spec("numba") is not None
+
+
+# Stock status per product, most urgent first
+STOCK_CRITICAL, STOCK_LOW, STOCK_HIGH, STOCK_OPTIMAL = range(4)
+
+
+def safe_divide(num, den: np.ndarray, fill: float) -> np.ndarray:
+    """num / den where den > 0, fill where it is not, without dividing by zero."""
+    out = np.full(np.shape(den), fill, dtype=np.float64)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def _compute_stock_levels_numpy(qty: np.ndarray, daily: np.ndarray, price: np.ndarray,
+                                lead: float, safety: float, carry: float,
+                                ord_cost: float) -> Tuple[np.ndarray, ...]:
+    """NumPy version of compute_stock_levels()."""
+    annual = daily * 365
+    holding = price * carry
+
+    eoq = np.sqrt(safe_divide(2 * annual * ord_cost, holding, 0.0))
+
+    # At least weekly and at most quarterly supply; monthly supply for free items
+    eoq = np.maximum(np.maximum(1, annual / 52), np.minimum(eoq, annual / 4))
+    eoq = np.where(holding > 0, eoq, annual / 12)
+
+    reorder = (daily * lead) + (daily * safety)
+    min_stock = daily * safety
+    max_stock = reorder + eoq
+    status = np.where(qty < min_stock, STOCK_CRITICAL,
+                      np.where(qty < reorder, STOCK_LOW,
+                               np.where(qty > max_stock, STOCK_HIGH, STOCK_OPTIMAL)))
+    return eoq, reorder, min_stock, max_stock, status
+
+
+def _compute_stock_levels_loop(qty: np.ndarray, daily: np.ndarray, price: np.ndarray,
+                               lead: float, safety: float, carry: float,
+                               ord_cost: float) -> Tuple[np.ndarray, ...]:
+    """Per-product loop version of compute_stock_levels(), compiled by numba."""
+    n = qty.shape[0]
+    eoq = np.empty(n)
+    reorder = np.empty(n)
+    min_stock = np.empty(n)
+    max_stock = np.empty(n)
+    status = np.empty(n, dtype=np.int64)
+
+    for i in range(n):
+        annual = daily[i] * 365
+        holding = price[i] * carry
+
+        if holding <= 0:
+            order = annual / 12
+        else:
+            order = np.sqrt((2 * annual * ord_cost) / holding)
+            order = max(max(1.0, annual / 52), min(order, annual / 4))
+
+        eoq[i] = order
+        reorder[i] = (daily[i] * lead) + (daily[i] * safety)
+        min_stock[i] = daily[i] * safety
+        max_stock[i] = reorder[i] + order
+
+        if qty[i] < min_stock[i]:
+            status[i] = STOCK_CRITICAL
+        elif qty[i] < reorder[i]:
+            status[i] = STOCK_LOW
+        elif qty[i] > max_stock[i]:
+            status[i] = STOCK_HIGH
+        else:
+            status[i] = STOCK_OPTIMAL
+
+    return eoq, reorder, min_stock, max_stock, status
+
+
+def _classify_cumulative_numpy(values: np.ndarray, total: float, breaks: np.ndarray) -> np.ndarray:
+    """NumPy version of classify_cumulative()."""
+    return np.searchsorted(breaks, np.cumsum(values) / total * 100)
+
+
+def _classify_cumulative_loop(values: np.ndarray, total: float, breaks: np.ndarray) -> np.ndarray:
+    """Running-total loop version of classify_cumulative(), compiled by numba."""
+    n = values.shape[0]
+    classes = np.empty(n, dtype=np.int64)
+    cumulative = 0.0
+
+    for i in range(n):
+        cumulative += values[i]
+        percentage = cumulative / total * 100
+        c = 0
+        # "not <=" so a NaN share lands past the last break, as np.searchsorted puts it
+        while c < breaks.shape[0] and not percentage <= breaks[c]:
+            c += 1
+        classes[i] = c
+
+    return classes
+
+
+def _bucket_stock_levels_numpy(qty: np.ndarray, price: np.ndarray, out_of_stock: float,
+                               critical: float, low: float) -> Tuple:
+    """NumPy version of bucket_stock_levels()."""
+    level = np.where(qty <= out_of_stock, 0, np.where(qty <= critical, 1, np.where(qty <= low, 2, 3)))
+    out_idx, critical_idx, low_idx, healthy_idx = (np.flatnonzero(level == k) for k in range(4))
+    # Running sums, so the totals match the loop's in-order additions exactly
+    lost = np.cumsum(price[out_idx] * 10)
+    at_risk = np.cumsum(price[critical_idx] * qty[critical_idx])
+    return (out_idx, critical_idx, low_idx, healthy_idx,
+            lost[-1] if lost.size else 0.0, at_risk[-1] if at_risk.size else 0.0)
+
+
+def _bucket_stock_levels_loop(qty: np.ndarray, price: np.ndarray, out_of_stock: float,
+                              critical: float, low: float) -> Tuple:
+    """Single-pass loop version of bucket_stock_levels(), compiled by numba."""
+    n = qty.shape[0]
+    positions = np.empty((4, n), dtype=np.int64)
+    counts = np.zeros(4, dtype=np.int64)
+    lost = 0.0
+    at_risk = 0.0
+
+    for i in range(n):
+        if qty[i] <= out_of_stock:
+            level = 0
+            lost += price[i] * 10
+        elif qty[i] <= critical:
+            level = 1
+            at_risk += price[i] * qty[i]
+        elif qty[i] <= low:
+            level = 2
+        else:
+            level = 3
+        positions[level, counts[level]] = i
+        counts[level] += 1
+
+    return (positions[0, :counts[0]], positions[1, :counts[1]], positions[2, :counts[2]],
+            positions[3, :counts[3]], lost, at_risk)
+
+
+# Loop version -> compiled kernel (or NumPy fallback), filled on first use
+_kernels = {}
+
+
+def _kernel(loop: Callable, fallback: Callable) -> Callable:
+    """The numba-compiled loop when numba can be imported, else the NumPy version."""
+    kernel = _kernels.get(loop)
+    if kernel is None:
+        try:
+            from numba import njit
+            kernel = njit(cache=True)(loop)
+        except ImportError:
+            kernel = fallback
+        _kernels[loop] = kernel
+    return kernel
+
+
+def compute_stock_levels(qty: np.ndarray, daily: np.ndarray, price: np.ndarray,
+                         lead: float, safety: float, carry: float,
+                         ord_cost: float) -> Tuple[np.ndarray, ...]:
+    """(eoq, reorder, min_stock, max_stock, status) arrays for every product."""
+    kernel = _kernel(_compute_stock_levels_loop, _compute_stock_levels_numpy)
+    return kernel(qty, daily, price, lead, safety, carry, ord_cost)
+
+
+def classify_cumulative(values: np.ndarray, total: float, breaks: np.ndarray) -> np.ndarray:
+    """Number of breaks passed by the running percentage of total at each position of values."""
+    return _kernel(_classify_cumulative_loop, _classify_cumulative_numpy)(values, total, breaks)
+
+
+def bucket_stock_levels(qty: np.ndarray, price: np.ndarray, out_of_stock: float,
+                        critical: float, low: float) -> Tuple:
+    """
+    (out_of_stock, critical, low, healthy) position arrays and the (lost, at_risk) revenue sums.
+    
+    Each product takes the first level whose threshold its quantity does not exceed. Lost revenue
+    is ten units of every out-of-stock product; at-risk revenue is the critical stock's value.
+    """
+    kernel = _kernel(_bucket_stock_levels_loop, _bucket_stock_levels_numpy)
+    return kernel(qty, price, out_of_stock, critical, low)
+
+
+def warm_up() -> None:
+    """
+    Compile every kernel now instead of on its first call when numba is used.
+    
+    Nothing calls this on its own, so constructing an agent or tool never waits on numba;
+    an application that would rather pay the compile before serving requests calls it once.
+    """
+    if NUMBA_AVAILABLE:
+        compute_stock_levels(np.zeros(1, dtype=np.int64), np.ones(1), np.ones(1), 1.0, 1.0, 1.0, 1.0)
+        classify_cumulative(np.ones(1), 1.0, np.ones(1))
+        bucket_stock_levels(np.zeros(1, dtype=np.int64), np.ones(1), 0, 5, 10)
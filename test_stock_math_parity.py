@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Parity checks for the vectorized stock calculations and the inventory caches.
+
+Runs the batch kernels in src/utils/stock_math.py (compiled with numba when it is
+installed, the NumPy versions and the plain loops) on sample_inventory_sheet.csv and
+asserts they give what the original per-product formulas give. Then checks, against an
+in-memory copy of the sample sheet, that batch_check returns what single checks do and
+that a write makes the cached product listings stale.
+"""
+
+import csv
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add src to path
+sys.path.append('src')
+
+from agents.stock_calculator_agent import StockCalculatorAgent
+from tools.google_sheets_inventory_tool import GoogleSheetsInventoryTool, GoogleSheetsInventoryInput
+from utils import stock_math
+
+SAMPLE_SHEET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_inventory_sheet.csv")
+
+
+def load_sample_rows():
+    """The sample sheet as the rows of strings a worksheet holds, header first."""
+    with open(SAMPLE_SHEET, newline="") as f:
+        return [row for row in csv.reader(f) if row]
+
+
+def load_sample_products():
+    """The sample sheet's products as list_all returns them."""
+    header, *rows = load_sample_rows()
+    return [{
+        "product_id": row[0],
+        "product_name": row[1],
+        "quantity": int(row[2]),
+        "price": float(row[3]),
+        "category": row[4],
+        "status": row[5],
+        "last_updated": row[6]
+    } for row in rows]
+
+
+def test_stock_levels(products):
+    """EOQ, reorder point, min/max stock and status match the per-product formulas."""
+    print("\n1️⃣ Testing stock level kernels...")
+    agent = StockCalculatorAgent()
+    lead, safety, carry = agent.lead_time_days, agent.safety_stock_days, agent.carrying_cost_rate
+
+    # Per-product formulas of the original optimal stock report
+    expected = []
+    for product in products:
+        daily_demand = agent._estimate_daily_demand(product)
+        eoq = agent._calculate_eoq(product, daily_demand * 365)
+        reorder_point = (daily_demand * lead) + (daily_demand * safety)
+        min_stock = daily_demand * safety
+        max_stock = reorder_point + eoq
+        quantity = product["quantity"]
+        if quantity < min_stock:
+            status = stock_math.STOCK_CRITICAL
+        elif quantity < reorder_point:
+            status = stock_math.STOCK_LOW
+        elif quantity > max_stock:
+            status = stock_math.STOCK_HIGH
+        else:
+            status = stock_math.STOCK_OPTIMAL
+        expected.append((daily_demand, eoq, reorder_point, min_stock, max_stock, status))
+    daily, eoq, reorder, min_stock, max_stock, status = (np.array(column) for column in zip(*expected))
+
+    levels = agent._stock_levels(agent._product_table(products))
+    assert np.allclose(levels.daily_demand, daily, rtol=1e-12, atol=0)
+
+    qty = np.array([p["quantity"] for p in products], dtype=np.float64)
+    price = np.array([p["price"] for p in products], dtype=np.float64)
+    # compute_stock_levels() is the numba-compiled loop when numba is installed
+    variants = {
+        "compute_stock_levels": stock_math.compute_stock_levels,
+        "numpy": stock_math._compute_stock_levels_numpy,
+        "loop": stock_math._compute_stock_levels_loop,
+    }
+    for name, kernel in variants.items():
+        got = kernel(qty, daily, price, float(lead), float(safety), float(carry), 50.0)
+        for column, want in zip(got[:4], (eoq, reorder, min_stock, max_stock)):
+            assert np.allclose(column, want, rtol=1e-12, atol=0), name
+        assert got[4].tolist() == status.tolist(), name
+        print(f"✅ {name} matches the per-product formulas")
+
+
+def test_abc_classes(products):
+    """ABC classes from classify_cumulative() match the running-percentage loop."""
+    print("\n2️⃣ Testing ABC classification kernels...")
+    agent = StockCalculatorAgent()
+    annual_value = np.array([agent._estimate_daily_demand(p) * 365 * p["price"] for p in products])
+    ranked = np.argsort(-annual_value, kind="stable")
+    values = annual_value[ranked]
+    total = sum(annual_value.tolist())
+    breaks = np.array([80.0, 95.0])
+
+    # Per-product loop of the original ABC analysis
+    expected = []
+    cumulative = 0
+    for value in values.tolist():
+        cumulative += value
+        percentage = cumulative / total * 100
+        expected.append(0 if percentage <= 80 else 1 if percentage <= 95 else 2)
+
+    variants = {
+        "classify_cumulative": stock_math.classify_cumulative,
+        "numpy": stock_math._classify_cumulative_numpy,
+        "loop": stock_math._classify_cumulative_loop,
+    }
+    for name, kernel in variants.items():
+        assert kernel(values, total, breaks).tolist() == expected, name
+        print(f"✅ {name} matches the per-product loop")
+
+
+def test_stock_buckets(products):
+    """bucket_stock_levels() splits and totals products like the sales tool's alert loop."""
+    print("\n3️⃣ Testing stock bucket kernels...")
+    out_of_stock, critical, low = 0, 5, 10
+
+    # Per-product loop of the original stock alerts
+    buckets = ([], [], [], [])
+    for i, product in enumerate(products):
+        quantity = product["quantity"]
+        if quantity <= out_of_stock:
+            buckets[0].append(i)
+        elif quantity <= critical:
+            buckets[1].append(i)
+        elif quantity <= low:
+            buckets[2].append(i)
+        else:
+            buckets[3].append(i)
+    lost = sum(products[i]["price"] * 10 for i in buckets[0])
+    at_risk = sum(products[i]["price"] * products[i]["quantity"] for i in buckets[1])
+
+    qty = np.array([p["quantity"] for p in products], dtype=np.int64)
+    price = np.array([p["price"] for p in products], dtype=np.float64)
+    variants = {
+        "bucket_stock_levels": stock_math.bucket_stock_levels,
+        "numpy": stock_math._bucket_stock_levels_numpy,
+        "loop": stock_math._bucket_stock_levels_loop,
+    }
+    for name, kernel in variants.items():
+        *positions, got_lost, got_at_risk = kernel(qty, price, out_of_stock, critical, low)
+        assert [p.tolist() for p in positions] == list(buckets), name
+        assert float(got_lost) == lost and float(got_at_risk) == at_risk, name
+        print(f"✅ {name} matches the per-product loop")
+
+
+class SampleWorksheet:
+    """In-memory worksheet holding the sample sheet, with the gspread calls the tool makes."""
+
+    def __init__(self, rows):
+        self.rows = [list(row) for row in rows]
+
+    def find(self, query):
+        for row_number, row in enumerate(self.rows, 1):
+            if query in row:
+                return SimpleNamespace(row=row_number, col=row.index(query) + 1, value=query)
+        return None
+
+    def row_values(self, row_number):
+        row = list(self.rows[row_number - 1])
+        while row and row[-1] == "":
+            row.pop()
+        return row
+
+    def get_all_values(self):
+        return [list(row) for row in self.rows]
+
+    def get(self, range_name, pad_values=False):
+        return [list(row) for row in self.rows]
+
+    def batch_update(self, updates, value_input_option=None):
+        for update in updates:
+            cell = update["range"]
+            column, row_number = ord(cell[0]) - ord("A"), int(cell[1:])
+            self.rows[row_number - 1][column] = str(update["values"][0][0])
+
+    def append_rows(self, rows):
+        self.rows.extend([str(value) for value in row] for row in rows)
+
+
+def sheet_tool(worksheet, tool_class=GoogleSheetsInventoryTool):
+    """A tool reading worksheet, as it would after opening the sample spreadsheet."""
+    tool = tool_class(spreadsheet_id="sample-inventory")
+    tool._worksheet = worksheet
+    return tool
+
+
+def test_batch_check(rows):
+    """batch_check returns what a check of each product returns."""
+    print("\n4️⃣ Testing batch_check against check...")
+    tool = sheet_tool(SampleWorksheet(rows))
+    product_ids = [row[0] for row in rows[1:]] + ["MISSING001"]
+
+    expected = {}
+    for product_id in product_ids:
+        result = tool.execute(GoogleSheetsInventoryInput(action="check", product_id=product_id))
+        if result.success:
+            expected[product_id] = result.result
+
+    result = tool.execute(GoogleSheetsInventoryInput(action="batch_check", product_ids=product_ids))
+    assert result.success, result.error
+    assert result.result == expected
+    assert "MISSING001" not in result.result
+    print(f"✅ batch_check matches check for {len(expected)} products")
+
+
+def test_write_invalidates_listing(rows):
+    """A write through any tool instance makes every cached listing of the sheet stale."""
+    print("\n5️⃣ Testing cached listings after a write...")
+    from src.tools.google_sheets_inventory_tool import GoogleSheetsInventoryTool as SrcInventoryTool
+
+    worksheet = SampleWorksheet(rows)
+    reader = sheet_tool(worksheet)
+    # The agents import the tool as src.tools; writes through it must reach this one too
+    writer = sheet_tool(worksheet, SrcInventoryTool)
+    calculator = StockCalculatorAgent()
+    calculator.inventory_tool = reader
+    list_all = GoogleSheetsInventoryInput(action="list_all")
+    product_id = rows[1][0]
+
+    def listed_quantity(result):
+        return next(p["quantity"] for p in result.result if p["product_id"] == product_id)
+
+    before = reader.execute(list_all)
+    assert listed_quantity(calculator._list_all_products()) == listed_quantity(before)
+
+    # Changing a listed product must not change the cached listing
+    before.result[0]["quantity"] = -1
+    assert listed_quantity(reader.execute(list_all)) == int(rows[1][2])
+
+    new_quantity = int(rows[1][2]) + 7
+    update = writer.execute(GoogleSheetsInventoryInput(action="update", product_id=product_id, quantity=new_quantity))
+    assert update.success, update.error
+
+    assert listed_quantity(reader.execute(list_all)) == new_quantity
+    assert listed_quantity(calculator._list_all_products()) == new_quantity
+    print("✅ Listings and the calculator snapshot see the write")
+
+
+if __name__ == "__main__":
+    print("🧪 Starting stock calculation parity tests...")
+    print("=" * 60)
+
+    sample_rows = load_sample_rows()
+    sample_products = load_sample_products()
+    print(f"📄 {len(sample_products)} products from {os.path.basename(SAMPLE_SHEET)}")
+    print(f"⚙️ numba {'installed' if stock_math.NUMBA_AVAILABLE else 'not installed, NumPy versions only'}")
+
+    test_stock_levels(sample_products)
+    test_abc_classes(sample_products)
+    test_stock_buckets(sample_products)
+    test_batch_check(sample_rows)
+    test_write_invalidates_listing(sample_rows)
+
+    print("\n" + "=" * 60)
+    print("🎉 All parity tests passed!")